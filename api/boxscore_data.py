@@ -1,19 +1,18 @@
-import requests
+import copy
+import time
+import httpx
 from utils.time_conversions import convert_iso_minutes
-from services.redis_service import get_cache, set_cache
+from services.redis_service import get_cache, set_cache, single_flight, SINGLE_FLIGHT_FETCH_DEADLINE
+from services.conditional_http import fetch_json_if_modified
+from services.ttl_policy import game_state, cache_ttl
+from utils.optimizations import set_cache_with_response
 
+# TTL while a game is live; see services/ttl_policy for scheduled and final games
 BOXSCORE_CACHE_TIMEOUT = 15
+# Per-game player row versions outlive the box score itself so long sessions can keep asking for deltas
+BOXSCORE_VERSION_TIMEOUT = 21600
 BOXSCORE_URL_TEMPLATE = "https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{game_id}.json"
 
-session = requests.Session()
-
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Accept': 'application/json'
-}
-
-session.headers.update(HEADERS)
-
 def _process_player_stats(player_data):
     """Formats raw player data for display based on the provided JSON structure."""
     stats = player_data.get('statistics', {})
@@ -39,6 +38,18 @@ def _process_player_stats(player_data):
     }
 
 
+def _sort_by_minutes(players):
+    """Player rows sorted by minutes played, most first."""
+    def time_to_seconds(time_str):
+        try:
+            m, s = map(int, time_str.split(':'))
+            return m * 60 + s
+        except ValueError:
+            return 0
+
+    return sorted(players, key=lambda p: time_to_seconds(p['min']), reverse=True)
+
+
 def get_single_game_boxscore(game_id: str):
     """
     Fetches the box score for a specific game ID.
@@ -50,50 +61,136 @@ def get_single_game_boxscore(game_id: str):
     if cached_data:
         return cached_data
 
-    url = BOXSCORE_URL_TEMPLATE.format(game_id=game_id)
+    # Only one request per expiry goes upstream; the rest wait for its result
+    result = single_flight(cache_key, lambda: _fetch_boxscore(game_id, cache_key))
+    if result is None:
+        return {"error": "Box score is still loading. Please try again shortly."}
+    return result
 
-    try:
-        response = session.get(url, timeout=5)
-        response.raise_for_status()
-        boxscore = response.json()
 
-        game_data = boxscore.get('game', {})
-        home_team = game_data.get('homeTeam', {})
-        away_team = game_data.get('awayTeam', {})
+def _process_boxscore(boxscore: dict) -> dict:
+    """
+    Keeps the active players of both teams, sorted by minutes played:
+    {"boxscore": {tricode: {"players": [...]}}, "state": game state for the TTL policy}.
+    """
+    game_data = boxscore.get('game', {})
+    home_team = game_data.get('homeTeam', {})
+    away_team = game_data.get('awayTeam', {})
+
+    processed_data = {}
 
-        processed_data = {}
+    def process_team(team_data):
+        tricode = team_data.get('teamTricode')
+        if not tricode:
+            return
 
-        def process_team(team_data):
-            tricode = team_data.get('teamTricode')
-            if not tricode:
-                return
+        active_players = [
+            _process_player_stats(p) for p in team_data.get('players', [])
+            if p.get('status') == 'ACTIVE' and p.get('played') == '1'
+        ]
 
-            active_players = [
-                _process_player_stats(p) for p in team_data.get('players', [])
-                if p.get('status') == 'ACTIVE' and p.get('played') == '1'
-            ]
+        processed_data[tricode] = { 'players': _sort_by_minutes(active_players) }
 
-            def time_to_seconds(time_str):
-                try:
-                    m, s = map(int, time_str.split(':'))
-                    return m * 60 + s
-                except ValueError:
-                    return 0
+    process_team(home_team)
+    process_team(away_team)
 
-            active_players.sort(key=lambda p: time_to_seconds(p['min']), reverse=True)
+    return {"boxscore": processed_data, "state": game_state(game_data)}
 
-            processed_data[tricode] = { 'players': active_players }
 
-        process_team(home_team)
-        process_team(away_team)
+def _fetch_boxscore(game_id: str, cache_key: str):
+    """
+    Downloads and processes a box score from the NBA CDN, caching successful results.
+    Unchanged box scores (HTTP 304) reuse the last processed result.
+    Final box scores are kept for FINAL_TTL, then fetched again to pick up stat corrections.
+    """
+    url = BOXSCORE_URL_TEMPLATE.format(game_id=game_id)
 
-        set_cache(cache_key, processed_data, BOXSCORE_CACHE_TIMEOUT)
+    try:
+        result, changed = fetch_json_if_modified(url, _process_boxscore, deadline=SINGLE_FLIGHT_FETCH_DEADLINE)
+        processed_data = result["boxscore"]
+
+        timeout = cache_ttl(result["state"], BOXSCORE_CACHE_TIMEOUT)
+        set_cache_with_response(cache_key, processed_data, timeout)
+        if changed:
+            _record_boxscore_version(game_id, processed_data)
 
         return processed_data
 
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
              return {"error": "Box score not found (Game ID may be incorrect or game not yet live)."}
         return {"error": f"HTTP Error fetching box score: {e.response.status_code}"}
     except Exception as e:
         return {"error": f"Error processing box score data: {e.__class__.__name__}"}
+
+
+def _record_boxscore_version(game_id: str, processed_data: dict):
+    """
+    Bumps the game's box score version if any player row was added, changed or removed,
+    stamping those rows with the new version.
+    A new record starts at the current time in ms, so versions keep increasing even if it expires.
+    """
+    version_key = f"boxscore_version:{game_id}"
+    # Cached values are shared with readers, so work on a copy
+    record = copy.deepcopy(get_cache(version_key))
+    if not record:
+        now = int(time.time() * 1000)
+        record = {"base": now, "version": now, "rows": {}, "removed": {}}
+
+    version = record["version"] + 1
+    changed = False
+
+    for tricode, team_data in processed_data.items():
+        rows = record["rows"].setdefault(tricode, {})
+        removed = record["removed"].setdefault(tricode, {})
+        current_ids = set()
+
+        for player in team_data['players']:
+            player_id = str(player['id'])
+            current_ids.add(player_id)
+            previous = rows.get(player_id)
+            if previous is None or previous["row"] != player:
+                rows[player_id] = {"version": version, "row": player}
+                removed.pop(player_id, None)
+                changed = True
+
+        for player_id in list(rows):
+            if player_id not in current_ids:
+                del rows[player_id]
+                removed[player_id] = version
+                changed = True
+
+    if changed:
+        record["version"] = version
+        set_cache(version_key, record, BOXSCORE_VERSION_TIMEOUT)
+
+
+def get_boxscore_delta(game_id: str, since: int):
+    """
+    Returns the player rows added, changed or removed since the given version:
+    {"version", "full": False, "teams": {tricode: {"changed": [...], "removed": [ids]}}}.
+    If that version is unknown, returns every row with "full": True instead.
+    """
+    boxscore = get_single_game_boxscore(game_id)
+    if "error" in boxscore:
+        return boxscore
+
+    record = get_cache(f"boxscore_version:{game_id}")
+    if not record:
+        return {"version": 0, "full": True, "teams": boxscore}
+
+    if since < record["base"] or since > record["version"]:
+        teams = {
+            tricode: {'players': _sort_by_minutes(entry["row"] for entry in rows.values())}
+            for tricode, rows in record["rows"].items()
+        }
+        return {"version": record["version"], "full": True, "teams": teams}
+
+    teams = {}
+    for tricode, rows in record["rows"].items():
+        changed = [entry["row"] for entry in rows.values() if entry["version"] > since]
+        removed = [player_id for player_id, version in record["removed"].get(tricode, {}).items() if version > since]
+        if changed or removed:
+            teams[tricode] = {"changed": changed, "removed": removed}
+
+    return {"version": record["version"], "full": False, "teams": teams}
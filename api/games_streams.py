@@ -1,29 +1,22 @@
-import requests
-import concurrent.futures
+import asyncio
 from datetime import datetime
-import pytz
+from services import upstream_client
+from services.stream_health import get_stream_health, probe_streams, rank_games
 from utils.get_team_abbreves import get_normalized_team_key, abv
-from utils.time_conversions import format_et_to_cst_status, convert_ms_to_yyyymmdd, has_date_passed
+from utils.time_conversions import format_et_to_cst_status_batch, convert_ms_to_yyyymmdd, has_date_passed, ET_ZONE, CST_ZONE
 
-session = requests.Session()
+SOURCE_1_URL = "https://lotusgamehd.xyz/api-event.php?league=nba"
+SOURCE_2_URL = "https://streamed.pk/api/matches/basketball"
 
-# 2. Define headers to mimic a real browser
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Accept': 'application/json'
-}
-session.headers.update(HEADERS)
+# The whole games-list fetch never takes longer than this; slower sources are dropped
+SOURCES_DEADLINE = 12
 
-def get_basketball_games_source_1():
-    """Fetches from Lotus.xyz and returns a dict keyed by 'YYYY-MM-DD_TEAMKEY'"""
-    API_URL = "https://lotusgamehd.xyz/api-event.php?league=nba"
+def parse_lotus_games(data):
+    """Parses the Lotus.xyz feed into a dict keyed by 'YYYY-MM-DD_TEAMKEY'."""
     games_dict = {}
+    start_times_et = {} # game_key -> when_et, formatted for the whole slate at the end
 
     try:
-        response = session.get(API_URL, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
         for day in data.get("days", []):
             for game in day.get("items", []):
 
@@ -42,9 +35,8 @@ def get_basketball_games_source_1():
 
                 # 3. Calculate Timestamp for Polling Gatekeeper (ET -> UTC Timestamp)
                 try:
-                    et_tz = pytz.timezone('US/Eastern')
                     dt_object = datetime.strptime(game["when_et"], "%Y-%m-%d %H:%M")
-                    dt_aware = et_tz.localize(dt_object)
+                    dt_aware = ET_ZONE.localize(dt_object)
                     game_timestamp = dt_aware.timestamp()
                 except Exception:
                     game_timestamp = 0
@@ -65,7 +57,7 @@ def get_basketball_games_source_1():
                     "id": game_key,
                     "title": new_title,
                     "start_timestamp": game_timestamp, # Used by frontend to delay polling
-                    "game_start": format_et_to_cst_status(game["when_et"]),
+                    "game_start": None, # Filled in below by the batch formatter
                     "status": f"🔴 {game['status']}" if game["status"] == "LIVE" else game["status"],
                     "teams": away + home,
                     "away_tricode": abv.get(away_team, away), # Safety get
@@ -73,35 +65,84 @@ def get_basketball_games_source_1():
                     "streams": [stream_url]
                 }
                 games_dict[game_key] = game_data
+                start_times_et[game_key] = game["when_et"]
 
     except Exception as e:
         print(f"An unexpected error occurred in source 1: {e}")
 
+    game_starts = format_et_to_cst_status_batch(list(start_times_et.values()))
+    for game_key, game_start in zip(start_times_et, game_starts):
+        games_dict[game_key]["game_start"] = game_start
+
     return games_dict
 
-def get_basketball_games_source_2():
-    """Fetches from Streamed.pk and returns a dict keyed by 'YYYY-MM-DD_TEAMKEY'"""
-    API_URL = "https://streamed.pk/api/matches/basketball"
-    games_dict = {}
+STREAMED_IMG_BASE_URL = "https://streamed.pk/api/images/proxy/"
+
+def _streamed_nba_game(game, game_key, title, away, home, streams_list):
+    return {
+        "id": game_key,
+        "title": title,
+        "start_timestamp": game.get("date", 0) / 1000,
+        "game_start": convert_ms_to_yyyymmdd(game["date"]) if "date" in game else "TBD",
+        "status": game.get("status", "Scheduled"),
+        "teams": away + home,
+        "away_tricode": away,
+        "home_tricode": home,
+        "streams": streams_list
+    }
+
+def _streamed_other_game(game, streams_list):
+    clean_title = game["title"].strip()
+    date_ms = game.get("date", 0)
+    slug_title = clean_title.lower().replace(' ', '-').replace(':', '').replace('.', '')
+    game_key = f"other_{date_ms}_{slug_title}"
 
     try:
-        response = session.get(API_URL, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        dt_obj = datetime.fromtimestamp(date_ms / 1000, CST_ZONE)
+        game_start_str = dt_obj.strftime('%Y-%m-%d %I:%M %p')
+    except Exception:
+        game_start_str = "TBD"
+
+    home_team = "Home"
+    away_team = "Away"
+    home_logo_url = None
+    away_logo_url = None
+    game_started_yet = has_date_passed(game.get("date"))
+    if "teams" in game:
+        home_data = game.get("teams", {}).get("home", {})
+        away_data = game.get("teams", {}).get("away", {})
+
+        home_team = home_data.get("name", "Home")
+        away_team = away_data.get("name", "Away")
+
+        if home_data.get("badge"):
+            home_logo_url = f"{STREAMED_IMG_BASE_URL}{home_data['badge']}.webp"
+        if away_data.get("badge"):
+            away_logo_url = f"{STREAMED_IMG_BASE_URL}{away_data['badge']}.webp"
+
+    return game_key, {
+        "id": game_key,
+        "title": clean_title,
+        "start_timestamp": date_ms / 1000,
+        "game_start": game_start_str,
+        "status": "🔴 LIVE" if game_started_yet else "Scheduled",
+        "teams": "OTHER",
+        "away_team_full": away_team,
+        "home_team_full": home_team,
+        "away_logo": away_logo_url,
+        "home_logo": home_logo_url,
+        "streams": streams_list
+    }
+
+def parse_streamed_games(data):
+    """
+    Parses the Streamed.pk feed in one pass into a dict of NBA games keyed by
+    'YYYY-MM-DD_TEAMKEY' plus popular non-NBA games keyed 'other_...' (teams == "OTHER").
+    """
+    games_dict = {}
 
+    try:
         for game in data:
-            team_key, title, away, home = get_normalized_team_key(game["title"])
-            if not team_key:
-                continue
-
-            date_str = convert_ms_to_yyyymmdd(game["date"])
-            if not date_str:
-                continue
-
-            game_key = f"{date_str}_{team_key}"
-
-            game_timestamp = game.get("date", 0) / 1000
-
             streams_list = []
             for source in game.get("sources", []):
                 if source.get("id"):
@@ -111,128 +152,131 @@ def get_basketball_games_source_2():
             if not streams_list:
                 continue
 
-            game_data = {
-                "id": game_key,
-                "title": title,
-                "start_timestamp": game_timestamp,
-                "game_start": convert_ms_to_yyyymmdd(game["date"]) if "date" in game else "TBD",
-                "status": game.get("status", "Scheduled"),
-                "teams": away + home,
-                "away_tricode": away,
-                "home_tricode": home,
-                "streams": streams_list
-            }
-            games_dict[game_key] = game_data
+            team_key, title, away, home = get_normalized_team_key(game["title"])
+            if team_key:
+                date_str = convert_ms_to_yyyymmdd(game["date"])
+                if not date_str:
+                    continue
+
+                game_key = f"{date_str}_{team_key}"
+                games_dict[game_key] = _streamed_nba_game(game, game_key, title, away, home, streams_list)
+
+            elif game.get("popular", False) and game.get("date") != 0:
+                game_key, game_data = _streamed_other_game(game, streams_list)
+                games_dict[game_key] = game_data
 
     except Exception as e:
-        print(f"An unexpected error occurred in source 2: {e}")
+        print(f"An unexpected error occurred in source streamed: {e}")
 
     return games_dict
 
-def get_basketball_games():
+# Stream providers, merged in priority order (lower first). Sources with adds_games
+# define which games exist; the others only contribute extra streams to those games.
+STREAM_SOURCES = []
+
+def register_stream_source(name, url, parser, timeout=10, priority=100, adds_games=False):
     """
-    Fetches games from both sources in PARALLEL to reduce wait time.
+    Adds a provider to the games list. parser(json) returns {game_key: game}
+    with keys built like 'YYYY-MM-DD_TEAMKEY' so they line up across sources.
+    """
+    STREAM_SOURCES.append({
+        "name": name,
+        "url": url,
+        "parser": parser,
+        "timeout": timeout,
+        "priority": priority,
+        "adds_games": adds_games,
+    })
+    STREAM_SOURCES.sort(key=lambda source: source["priority"])
+
+register_stream_source("lotus", SOURCE_1_URL, parse_lotus_games, timeout=10, priority=0, adds_games=True)
+register_stream_source("streamed", SOURCE_2_URL, parse_streamed_games, timeout=10, priority=10)
+
+async def _fetch_source(source):
+    data = await upstream_client.fetch_json(source["url"], timeout=source["timeout"])
+    # Parse off the shared event loop so other in-flight fetches keep moving
+    return await asyncio.to_thread(source["parser"], data)
+
+async def _fetch_sources(sources, deadline):
+    """
+    Fetches and parses every source concurrently.
+    Returns {name: games_dict} for the ones that finished within the deadline.
+    """
+    tasks = {asyncio.ensure_future(_fetch_source(source)): source["name"] for source in sources}
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+    for task in pending:
+        task.cancel()
+        print(f"Stream source {tasks[task]} missed the {deadline}s deadline")
+
+    results = {}
+    for task in done:
+        if task.exception():
+            print(f"An unexpected error occurred in source {tasks[task]}: {task.exception()}")
+        else:
+            results[tasks[task]] = task.result()
+    return results
+
+def merge_stream_sources(results, sources=STREAM_SOURCES):
+    """
+    Merges per-source game dicts: adds_games sources create the games (in priority
+    order), then every other source adds its streams to games that already exist.
     """
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future_1 = executor.submit(get_basketball_games_source_1)
-        future_2 = executor.submit(get_basketball_games_source_2)
-
-        games_s1_dict = future_1.result()
-        games_s2_dict = future_2.result()
-
     merged_games = {}
-    merged_games.update(games_s1_dict)
-
-    for game_key, game_s2 in games_s2_dict.items():
-        if game_key in merged_games:
-            existing_streams = merged_games[game_key]["streams"]
-            for s in game_s2["streams"]:
-                if s not in existing_streams:
-                    existing_streams.append(s)
-        # else:
-        #     # This is a new game, just add it
-        #     merged_games[game_key] = game_s2
+    ordered = [source for source in sources if source["adds_games"]] + \
+              [source for source in sources if not source["adds_games"]]
+
+    for source in ordered:
+        games = results.get(source["name"], {})
+        for game_key, game in games.items():
+            if game_key in merged_games:
+                existing_streams = merged_games[game_key]["streams"]
+                for s in game["streams"]:
+                    if s not in existing_streams:
+                        existing_streams.append(s)
+            elif source["adds_games"]:
+                merged_games[game_key] = game
 
     return list(merged_games.values())
 
+def other_games_from_sources(results):
+    """The non-NBA games every source reported, soonest first."""
+    games_dict = {}
+    for games in results.values():
+        for game_key, game in games.items():
+            if game["teams"] == "OTHER":
+                games_dict.setdefault(game_key, game)
+    return sorted(games_dict.values(), key=lambda x: x['start_timestamp'])
 
-def get_euro_basketball_games():
+def get_game_lists(probe=False):
     """
-    Fetches NON-NBA, POPULAR games from Streamed.pk.
+    One refresh cycle: every source is downloaded and parsed once, and both the
+    NBA and the non-NBA game lists are derived from that snapshot.
+    With probe=True the embeds are health-checked first (leader only; costs up to PROBE_BUDGET).
+    Returns (nba_games, other_games) with streams ranked by health.
     """
-    API_URL = "https://streamed.pk/api/matches/basketball"
-    IMG_BASE_URL = "https://streamed.pk/api/images/proxy/"
-    games_dict = {}
-
-    try:
-        response = session.get(API_URL, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+    results = upstream_client.run(_fetch_sources(STREAM_SOURCES, SOURCES_DEADLINE))
+    nba_games, other_games = merge_stream_sources(results), other_games_from_sources(results)
 
-        for game in data:
-            if game.get("date") == 0:
-                continue
-
-            if not game.get("popular", False):
-                continue
+    if probe:
+        health = probe_streams([url for game in nba_games + other_games for url in game["streams"]])
+    else:
+        health = get_stream_health()
+    return rank_games(nba_games, health), rank_games(other_games, health)
 
-            nba_key, _, _, _ = get_normalized_team_key(game["title"])
-            if nba_key:
-                continue
-
-            clean_title = game["title"].strip()
-            date_ms = game.get("date", 0)
-            slug_title = clean_title.lower().replace(' ', '-').replace(':', '').replace('.', '')
-            game_key = f"other_{date_ms}_{slug_title}"
-
-            try:
-                dt_obj = datetime.fromtimestamp(date_ms / 1000, pytz.timezone('US/Central'))
-                game_start_str = dt_obj.strftime('%Y-%m-%d %I:%M %p')
-            except Exception:
-                game_start_str = "TBD"
-
-            streams_list = []
-            for source in game.get("sources", []):
-                if source.get("id"):
-                    stream_url = f"https://embedsports.top/embed/{source['source']}/{source['id']}/1"
-                    streams_list.append(stream_url)
-
-            if not streams_list:
-                continue
-
-            home_team = "Home"
-            away_team = "Away"
-            home_logo_url = None
-            away_logo_url = None
-            game_started_yet = has_date_passed(game.get("date"))
-            if "teams" in game:
-                home_data = game.get("teams", {}).get("home", {})
-                away_data = game.get("teams", {}).get("away", {})
-
-                home_team = home_data.get("name", "Home")
-                away_team = away_data.get("name", "Away")
-
-                if home_data.get("badge"):
-                    home_logo_url = f"{IMG_BASE_URL}{home_data['badge']}.webp"
-                if away_data.get("badge"):
-                    away_logo_url = f"{IMG_BASE_URL}{away_data['badge']}.webp"
-
-            game_data = {
-                "id": game_key,
-                "title": clean_title,
-                "start_timestamp": date_ms / 1000,
-                "game_start": game_start_str,
-                "status": "🔴 LIVE" if game_started_yet else "Scheduled",
-                "teams": "OTHER",
-                "away_team_full": away_team,
-                "home_team_full": home_team,
-                "away_logo": away_logo_url,
-                "home_logo": home_logo_url,
-                "streams": streams_list
-            }
-            games_dict[game_key] = game_data
+def get_basketball_games():
+    """
+    Fetches games from every registered source in PARALLEL, bounded by SOURCES_DEADLINE.
+    A slow or failing source only costs its streams, not the whole list.
+    """
+    results = upstream_client.run(_fetch_sources(STREAM_SOURCES, SOURCES_DEADLINE))
+    return rank_games(merge_stream_sources(results), get_stream_health())
 
-    except Exception as e:
-        print(f"Error fetching other games: {e}")
 
-    return sorted(games_dict.values(), key=lambda x: x['start_timestamp'])
+def get_euro_basketball_games():
+    """
+    Fetches NON-NBA, POPULAR games, from Streamed.pk only.
+    """
+    sources = [source for source in STREAM_SOURCES if source["name"] == "streamed"]
+    results = upstream_client.run(_fetch_sources(sources, SOURCES_DEADLINE))
+    return rank_games(other_games_from_sources(results), get_stream_health())
@@ -0,0 +1,72 @@
+import concurrent.futures
+from services.redis_service import get_many
+from api.boxscore_data import get_single_game_boxscore
+from api.momentum import get_momentum_data
+
+# Multiview shows at most this many games at once
+LIVE_MAX_GAMES = 4
+
+# Per-game details a caller can opt into with fields=; the scoreboard is always included
+LIVE_DETAIL_FIELDS = {
+    "boxscore": ("boxscore:{}", get_single_game_boxscore),
+    "momentum": ("momentum_3min:{}", get_momentum_data),
+}
+
+def _get_game_details(game_ids, fields):
+    """
+    The requested detail fields for several NBA game ids.
+    Cached entries come from one batched read; the rest are fetched from upstream in parallel.
+    """
+    pairs = [(game_id, field) for game_id in game_ids for field in fields]
+    cached = get_many([LIVE_DETAIL_FIELDS[field][0].format(game_id) for game_id, field in pairs])
+
+    details = {game_id: {} for game_id in game_ids}
+    missing = []
+    for (game_id, field), value in zip(pairs, cached):
+        details[game_id][field] = value
+        if value is None:
+            missing.append((game_id, field, LIVE_DETAIL_FIELDS[field][1]))
+
+    if missing:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            futures = {executor.submit(fetch, game_id): (game_id, field) for game_id, field, fetch in missing}
+            for future in concurrent.futures.as_completed(futures):
+                game_id, field = futures[future]
+                try:
+                    details[game_id][field] = future.result()
+                except Exception as e:
+                    print(f"Live Data Error for {game_id} {field}: {e}")
+
+    return details
+
+
+def get_live_games(stream_ids, games_list, full_scoreboard, fields=()):
+    """
+    Scoreboard for the given multiview stream ids, plus any of "boxscore" and
+    "momentum" listed in fields: {stream_id: {"scoreboard", *fields}}.
+    Games without an NBA scoreboard entry (e.g. other leagues) get None / [],
+    and details are only looked up once a game has started.
+    """
+    fields = [field for field in dict.fromkeys(fields) if field in LIVE_DETAIL_FIELDS]
+    games_by_id = {game["id"]: game for game in games_list}
+
+    scoreboards = {}
+    for stream_id in stream_ids[:LIVE_MAX_GAMES]:
+        game = games_by_id.get(stream_id)
+        scoreboards[stream_id] = full_scoreboard.get(game["teams"]) if game else None
+
+    started_ids = list(dict.fromkeys(
+        scoreboard["game_id"] for scoreboard in scoreboards.values()
+        if scoreboard and scoreboard.get("game_started_yet")
+    ))
+    details = _get_game_details(started_ids, fields) if started_ids and fields else {}
+
+    live_games = {}
+    for stream_id, scoreboard in scoreboards.items():
+        game_details = details.get(scoreboard["game_id"], {}) if scoreboard else {}
+        live_games[stream_id] = {"scoreboard": scoreboard}
+        if "boxscore" in fields:
+            live_games[stream_id]["boxscore"] = game_details.get("boxscore")
+        if "momentum" in fields:
+            live_games[stream_id]["momentum"] = game_details.get("momentum") or []
+    return live_games
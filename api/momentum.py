@@ -1,8 +1,15 @@
-from nba_api.live.nba.endpoints import playbyplay
-from services.redis_service import get_cache, set_cache
+from services.redis_service import get_cache, set_cache, single_flight, SINGLE_FLIGHT_FETCH_DEADLINE
+from services import upstream_client
+from services.ttl_policy import cache_ttl, GAME_STATUS_LIVE, GAME_STATUS_FINAL
+from utils.optimizations import set_cache_with_response
+import copy
 import json
 
+# TTL while a game is live; a finished game's chart is kept for FINAL_TTL
 CACHE_TIMEOUT = 60
+PLAYBYPLAY_URL_TEMPLATE = "https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_{game_id}.json"
+# Per-game cursor and chart so far, kept for the length of a game and then some
+MOMENTUM_STATE_TIMEOUT = 21600
 
 def get_momentum_data(game_id):
     """
@@ -17,71 +24,103 @@ def get_momentum_data(game_id):
     if cached_data:
         return cached_data
 
-    try:
-        pbp = playbyplay.PlayByPlay(game_id=game_id)
-        data = pbp.get_dict()
-        actions = data.get('game', {}).get('actions', [])
-
-        chart_data = []
-        chart_data.append({'label': 'Start', 'value': 0, 'period': 1})
-
-        last_home = 0
-        last_away = 0
-
-        # Track 3-minute buckets
-        # Buckets for 12 min Q: 4=(12-9), 3=(9-6), 2=(6-3), 1=(3-0), 0=(<0)
-        current_period = 0
-        last_bucket = 5 # Start higher than any possible bucket (12min / 3 = 4)
-
-        for action in actions:
-            try:
-                raw_home = action.get('scoreHome')
-                raw_away = action.get('scoreAway')
-                curr_home = int(float(raw_home)) if raw_home is not None else last_home
-                curr_away = int(float(raw_away)) if raw_away is not None else last_away
-
-                last_home = curr_home
-                last_away = curr_away
-
-                period = action.get('period', 0)
-                clock = action.get('clock', '')
-
-                # Reset bucket logic on new period
-                if period != current_period:
-                    current_period = period
-                    last_bucket = 5 # Reset to start of quarter
-
-                if clock:
-                    time_str = clock.replace('PT', '').replace('.00S', '').replace('M', ':')
-                    if 'S' in time_str: time_str = time_str.replace('S', '')
-
-                    # Calculate seconds remaining to determine bucket
-                    parts = time_str.split(':')
-                    if len(parts) == 2:
-                        minutes = int(parts[0])
-                        seconds = int(parts[1])
-                        total_seconds = minutes * 60 + seconds
-                    else:
-                        total_seconds = 0
+    return single_flight(cache_key, lambda: _build_momentum(game_id, cache_key)) or []
+
+
+def _new_momentum_state():
+    # Buckets for 12 min Q: 4=(12-9), 3=(9-6), 2=(6-3), 1=(3-0), 0=(<0)
+    return {
+        'last_action': 0,
+        'period': 0,
+        'bucket': 5, # Start higher than any possible bucket (12min / 3 = 4)
+        'last_home': 0,
+        'last_away': 0,
+        'final': False,
+        'chart': [{'label': 'Start', 'value': 0, 'period': 1}],
+    }
+
+
+def _apply_actions(state, actions):
+    """Walks the actions after the state's cursor, appending a chart point for each new 3-minute bucket."""
+    for action in actions:
+        action_number = action.get('actionNumber', 0)
+        if action_number <= state['last_action']:
+            continue
+        state['last_action'] = action_number
+
+        if action.get('actionType') == 'game' and action.get('subType') == 'end':
+            state['final'] = True
+
+        try:
+            raw_home = action.get('scoreHome')
+            raw_away = action.get('scoreAway')
+            curr_home = int(float(raw_home)) if raw_home is not None else state['last_home']
+            curr_away = int(float(raw_away)) if raw_away is not None else state['last_away']
+
+            state['last_home'] = curr_home
+            state['last_away'] = curr_away
+
+            period = action.get('period', 0)
+            clock = action.get('clock', '')
+
+            # Reset bucket logic on new period
+            if period != state['period']:
+                state['period'] = period
+                state['bucket'] = 5 # Reset to start of quarter
+
+            if clock:
+                time_str = clock.replace('PT', '').replace('.00S', '').replace('M', ':')
+                if 'S' in time_str: time_str = time_str.replace('S', '')
+
+                # Calculate seconds remaining to determine bucket
+                parts = time_str.split(':')
+                if len(parts) == 2:
+                    minutes = int(parts[0])
+                    seconds = int(parts[1])
+                    total_seconds = minutes * 60 + seconds
                 else:
-                    time_str = "00:00"
                     total_seconds = 0
+            else:
+                time_str = "00:00"
+                total_seconds = 0
+
+            current_bucket = total_seconds // 180
+
+            # Capture Data ONLY if we dropped into a new bucket
+            if current_bucket < state['bucket']:
+                state['chart'].append({
+                    'label': f"Q{period} {time_str}",
+                    'value': curr_home - curr_away,
+                    'period': period
+                })
+                state['bucket'] = current_bucket
+
+        except (ValueError, TypeError):
+            continue
 
-                current_bucket = total_seconds // 180
 
-                # 4. Capture Data ONLY if we dropped into a new bucket
-                if current_bucket < last_bucket:
-                    chart_data.append({
-                        'label': f"Q{period} {time_str}",
-                        'value': curr_home - curr_away,
-                        'period': period
-                    })
-                    last_bucket = current_bucket
+def _build_momentum(game_id, cache_key):
+    """
+    Downloads play-by-play from the NBA CDN and buckets the score differential.
+    Only actions after the game's saved cursor are processed; the chart so far is kept in Redis.
+    Once the game-end action arrives the chart is stored for FINAL_TTL.
+    """
+    try:
+        data = upstream_client.get_json(PLAYBYPLAY_URL_TEMPLATE.format(game_id=game_id), deadline=SINGLE_FLIGHT_FETCH_DEADLINE)
+        actions = data.get('game', {}).get('actions', [])
+
+        state_key = f"momentum_state:{game_id}"
+        # Cached values are shared with readers, so work on a copy
+        state = copy.deepcopy(get_cache(state_key)) or _new_momentum_state()
+        last_action = state['last_action']
 
-            except (ValueError, TypeError):
-                continue
+        _apply_actions(state, actions)
+        if state['last_action'] != last_action:
+            set_cache(state_key, state, MOMENTUM_STATE_TIMEOUT)
 
-        set_cache(cache_key, chart_data, CACHE_TIMEOUT)
+        chart_data = state['chart']
+        status = GAME_STATUS_FINAL if state.get('final') else GAME_STATUS_LIVE
+        set_cache_with_response(cache_key, chart_data, cache_ttl({"status": status}, CACHE_TIMEOUT))
         return chart_data
 
     except Exception as e:
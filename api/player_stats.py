@@ -1,24 +1,41 @@
-from nba_api.stats.endpoints import leaguedashplayerstats
 from services.redis_service import get_cache, set_cache
+from services import upstream_client
 
 PLAYER_STATS_CACHE_KEY = "nba_player_season_stats_2025_26"
 CACHE_DURATION = 86400  # 24 Hours
 
+LEAGUE_DASH_URL = "https://stats.nba.com/stats/leaguedashplayerstats"
+
+# stats.nba.com rejects requests that don't look like they come from nba.com
+STATS_HEADERS = {
+    'Accept': 'application/json, text/plain, */*',
+    'Referer': 'https://www.nba.com/',
+    'Origin': 'https://www.nba.com',
+    'x-nba-stats-origin': 'stats',
+    'x-nba-stats-token': 'true',
+}
+
+# The endpoint expects every filter to be present, even when empty
+LEAGUE_DASH_PARAMS = {
+    'College': '', 'Conference': '', 'Country': '', 'DateFrom': '', 'DateTo': '',
+    'Division': '', 'DraftPick': '', 'DraftYear': '', 'GameScope': '', 'GameSegment': '',
+    'Height': '', 'ISTRound': '', 'LastNGames': 0, 'LeagueID': '00', 'Location': '',
+    'MeasureType': 'Base', 'Month': 0, 'OpponentTeamID': 0, 'Outcome': '', 'PORound': 0,
+    'PaceAdjust': 'N', 'PerMode': 'PerGame', 'Period': 0, 'PlayerExperience': '',
+    'PlayerPosition': '', 'PlusMinus': 'N', 'Rank': 'N', 'Season': '2025-26',
+    'SeasonSegment': '', 'SeasonType': 'Regular Season', 'ShotClockRange': '',
+    'StarterBench': '', 'TeamID': 0, 'TwoWay': 0, 'VsConference': '', 'VsDivision': '',
+    'Weight': '',
+}
+
 def update_league_player_stats():
     """
     Fetches stats for ALL players in the league for the current season.
     Stores them in Redis as a dictionary keyed by Player ID.
-    Uses get_dict() to avoid pandas dependency.
+    Calls the stats.nba.com endpoint behind nba_api's LeagueDashPlayerStats directly.
     """
     try:
-        stats_endpoint = leaguedashplayerstats.LeagueDashPlayerStats(
-            season='2025-26',
-            per_mode_detailed='PerGame',
-            season_type_all_star='Regular Season'
-        )
-
-        # Use get_dict() instead of get_data_frames()
-        data = stats_endpoint.get_dict()
+        data = upstream_client.get_json(LEAGUE_DASH_URL, headers=STATS_HEADERS, params=LEAGUE_DASH_PARAMS)
         result_set = data['resultSets'][0]
         headers = result_set['headers']
         row_set = result_set['rowSet']
@@ -1,65 +1,161 @@
-import requests
-from utils.time_conversions import convert_et_to_cst_conditional, get_game_day_status, has_game_started
-from services.redis_service import get_cache, set_cache
+from datetime import datetime, timezone
+from utils.time_conversions import convert_et_to_cst_conditional_batch, get_game_day_status_batch, has_game_started_batch
+from services.redis_service import get_cache, set_cache, set_many, run_when_leader
+from utils.optimizations import response_cache_key, build_json_response
+from services.conditional_http import fetch_json_if_modified
+from services.ttl_policy import GAME_STATUS_SCHEDULED, GAME_STATUS_LIVE
 
 CACHE_TIMEOUT = 15
+SCOREBOARD_CACHE_KEY = "nba_scoreboard_live"
+# The /api/scoreboard payload, pre-serialized whenever the scoreboard is written
+SCOREBOARD_RESPONSE_KEY = "api_scoreboard"
 SCOREBOARD_URL = "https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json"
 
-session = requests.Session()
+# Poller cadence: fast during games, medium shortly before tip-off, slow otherwise
+POLL_INTERVAL_LIVE = 10
+POLL_INTERVAL_PREGAME = 30
+POLL_INTERVAL_IDLE = 300
+PREGAME_WINDOW_SECONDS = 3600
 
 HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Accept': 'application/json',
     'Referer': 'https://www.nba.com/',
     'Origin': 'https://www.nba.com'
 }
-session.headers.update(HEADERS)
 
-def get_scoreboard_data(upcoming_games: list):
+def _process_scoreboard(games: dict) -> dict:
     """
-    Fetches scoreboard data using a persistent HTTP session for speed.
+    Shapes the raw scoreboard feed into per-game entries keyed by both team-code orders.
+    Only fields taken from the feed are set here, so the result can be reused on a 304;
+    _add_time_fields fills in the ones that depend on the current time.
     """
+    all_game_scoreboard = games["scoreboard"]["games"]
+    full_scoreboard_data = {}
 
-    full_scoreboard_data = get_cache("nba_scoreboard_live")
+    for game in all_game_scoreboard:
+        game_code = game["gameCode"].split('/')[1]
 
+        home_leader = game["gameLeaders"].get("homeLeaders", {})
+        away_leader = game["gameLeaders"].get("awayLeaders", {})
+
+        data = {
+            "quarter": game['gameStatusText'],
+            "best_stats_home": f'{home_leader.get("name", "N/A")} - {home_leader.get("points", 0)}pts - {home_leader.get("rebounds", 0)}rebs - {home_leader.get("assists", 0)}asts',
+            "best_stats_away": f'{away_leader.get("name", "N/A")} - {away_leader.get("points", 0)}pts - {away_leader.get("rebounds", 0)}rebs - {away_leader.get("assists", 0)}asts',
+            "home_score": game["homeTeam"]["score"],
+            "away_score": game["awayTeam"]["score"],
+            "game_id": game["gameId"],
+            "status_code": game["gameStatus"],
+            "start_time_utc": game["gameTimeUTC"]
+        }
+
+        full_scoreboard_data[game_code] = data
+
+        if len(game_code) == 6:
+            reversed_key = game_code[3:] + game_code[:3]
+            full_scoreboard_data[reversed_key] = data
+
+    return full_scoreboard_data
+
+def _add_time_fields(full_scoreboard_data: dict) -> dict:
+    """
+    Copies of the entries with game_status, game_started_yet and today_or_tomorrow
+    computed for right now. Runs on every poll, including after a 304.
+    """
+    games = list({data["game_id"]: data for data in full_scoreboard_data.values()}.values())
+
+    # Time formatting for the whole slate in one pass
+    start_times = [game["start_time_utc"] for game in games]
+    statuses = convert_et_to_cst_conditional_batch([game["quarter"] for game in games])
+    started = has_game_started_batch(start_times)
+    day_statuses = get_game_day_status_batch(start_times)
+
+    timed = {}
+    for i, game in enumerate(games):
+        timed[game["game_id"]] = {
+            **game,
+            "game_status": statuses[i],
+            "game_started_yet": started[i],
+            "today_or_tomorrow": day_statuses[i],
+        }
+
+    return {game_code: timed[data["game_id"]] for game_code, data in full_scoreboard_data.items()}
+
+def _fetch_scoreboard():
+    """
+    Downloads today's scoreboard from the NBA CDN, keyed by team codes.
+    An unchanged feed (HTTP 304) reuses the last processed result; the
+    time-dependent fields are recomputed either way.
+    Returns an empty dict if the fetch fails.
+    """
+    try:
+        full_scoreboard_data, _ = fetch_json_if_modified(SCOREBOARD_URL, _process_scoreboard, headers=HEADERS)
+        return _add_time_fields(full_scoreboard_data)
+
+    except Exception as e:
+        print(f"Scoreboard Fetch Error: {e}")
+        return {}
+
+def _next_poll_interval(full_scoreboard_data: dict) -> int:
+    """Picks how long to wait before the next scoreboard fetch based on game states."""
     if not full_scoreboard_data:
-        try:
-            response = session.get(SCOREBOARD_URL, timeout=5)
-            response.raise_for_status()
-            games = response.json()
-
-            all_game_scoreboard = games["scoreboard"]["games"]
-            full_scoreboard_data = {}
-
-            for game in all_game_scoreboard:
-                game_code = game["gameCode"].split('/')[1]
-
-                home_leader = game["gameLeaders"].get("homeLeaders", {})
-                away_leader = game["gameLeaders"].get("awayLeaders", {})
-
-                data = {
-                    "game_status": f"{convert_et_to_cst_conditional(game['gameStatusText'])}",
-                    "quarter": game['gameStatusText'],
-                    "game_started_yet": has_game_started(game["gameTimeUTC"]),
-                    "today_or_tomorrow": get_game_day_status(game["gameTimeUTC"]),
-                    "best_stats_home": f'{home_leader.get("name", "N/A")} - {home_leader.get("points", 0)}pts - {home_leader.get("rebounds", 0)}rebs - {home_leader.get("assists", 0)}asts',
-                    "best_stats_away": f'{away_leader.get("name", "N/A")} - {away_leader.get("points", 0)}pts - {away_leader.get("rebounds", 0)}rebs - {away_leader.get("assists", 0)}asts',
-                    "home_score": game["homeTeam"]["score"],
-                    "away_score": game["awayTeam"]["score"],
-                    "game_id": game["gameId"]
-                }
-
-                full_scoreboard_data[game_code] = data
-
-                if len(game_code) == 6:
-                    reversed_key = game_code[3:] + game_code[:3]
-                    full_scoreboard_data[reversed_key] = data
-
-            set_cache("nba_scoreboard_live", full_scoreboard_data, CACHE_TIMEOUT)
-
-        except Exception as e:
-            print(f"Scoreboard Fetch Error: {e}")
-            full_scoreboard_data = {}
+        return POLL_INTERVAL_LIVE # Retry failed fetches quickly
+
+    now = datetime.now(timezone.utc)
+    interval = POLL_INTERVAL_IDLE
+
+    for game in full_scoreboard_data.values():
+        status = game.get("status_code")
+        if status == GAME_STATUS_LIVE:
+            return POLL_INTERVAL_LIVE
+
+        if status == GAME_STATUS_SCHEDULED:
+            try:
+                tip_off = datetime.fromisoformat(game["start_time_utc"].replace('Z', '+00:00'))
+            except (KeyError, ValueError):
+                continue
+            # Includes games past their tip-off time that the feed hasn't flipped to live yet
+            if (tip_off - now).total_seconds() <= PREGAME_WINDOW_SECONDS:
+                interval = POLL_INTERVAL_PREGAME
+
+    return interval
+
+def cache_scoreboard_response(response_data: dict, timeout: int = POLL_INTERVAL_IDLE * 3):
+    """Stores the pre-serialized /api/scoreboard response, e.g. after the games list changed."""
+    set_cache(response_cache_key(SCOREBOARD_RESPONSE_KEY), build_json_response(response_data), timeout, broadcast=True)
+
+def _poll_scoreboard(build_response=None):
+    """
+    Fetches and caches the scoreboard once, with the /api/scoreboard response
+    built from it by build_response(full_scoreboard); returns the seconds until the next poll.
+    """
+    full_scoreboard_data = _fetch_scoreboard()
+    interval = _next_poll_interval(full_scoreboard_data)
+
+    # Keep the entries alive past the next poll so readers never find them empty
+    if full_scoreboard_data:
+        entries = {SCOREBOARD_CACHE_KEY: full_scoreboard_data}
+        if build_response:
+            entries[response_cache_key(SCOREBOARD_RESPONSE_KEY)] = build_json_response(build_response(full_scoreboard_data))
+        set_many(entries, interval * 3, broadcast=True)
+
+    return interval
+
+def run_scoreboard_poller(build_response=None):
+    """
+    Background loop that keeps the scoreboard cache fresh on its own schedule,
+    so request handlers never wait on cdn.nba.com.
+    Only the leader process polls; every other worker gets the result over pub/sub.
+    """
+    run_when_leader(lambda: _poll_scoreboard(build_response), name="scoreboard_poller")
+
+def get_scoreboard_data(upcoming_games: list, full_scoreboard_data=None):
+    """
+    Reads the scoreboard kept fresh by run_scoreboard_poller.
+    Pass full_scoreboard_data when the cached scoreboard was already read (e.g. via get_many).
+    """
+
+    if full_scoreboard_data is None:
+        full_scoreboard_data = get_cache(SCOREBOARD_CACHE_KEY) or {}
 
     result_scoreboards = {}
 
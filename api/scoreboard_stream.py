@@ -0,0 +1,91 @@
+import time
+import threading
+import orjson
+
+# How often the change detector re-reads the cached scoreboard
+CHANGE_CHECK_INTERVAL = 2
+# Idle connections get a comment this often so proxies don't close them
+KEEPALIVE_INTERVAL = 15
+# Tells EventSource how long to wait before reconnecting (ms)
+CLIENT_RETRY_MS = 5000
+
+# Only these fields count as a change worth pushing
+TRACKED_FIELDS = ("away_score", "home_score", "game_status", "quarter", "game_started_yet")
+
+# The one shared view of the scoreboard that every open stream reads from
+_condition = threading.Condition()
+_state = {"version": 0, "snapshot": {}, "changes": {}, "full": True}
+
+
+def _tracked(game: dict) -> tuple:
+    return tuple(game.get(field) for field in TRACKED_FIELDS)
+
+
+def _publish(snapshot: dict):
+    """Records a new scoreboard and wakes every stream if a score or status moved."""
+    with _condition:
+        previous = _state["snapshot"]
+        changes = {
+            teams: game for teams, game in snapshot.items()
+            if teams not in previous or _tracked(previous[teams]) != _tracked(game)
+        }
+        same_games = snapshot.keys() == previous.keys()
+        if not changes and same_games:
+            return
+
+        _state["version"] += 1
+        _state["snapshot"] = snapshot
+        _state["changes"] = changes
+        # A delta can't express a game leaving the scoreboard, so send everything
+        _state["full"] = not same_games
+        _condition.notify_all()
+
+
+def run_scoreboard_change_detector(build_snapshot):
+    """
+    Runs forever in a background thread: diffs the cached scoreboard
+    (build_snapshot() -> {teams: game}) and notifies the open streams.
+    One detector per process, however many clients are connected.
+    """
+    while True:
+        try:
+            _publish(build_snapshot())
+        except Exception as e:
+            print(f"Scoreboard Change Detector Error: {e}")
+        time.sleep(CHANGE_CHECK_INTERVAL)
+
+
+def _event(version: int, data: dict, full: bool) -> str:
+    # Full scoreboards are "snapshot" events, which replace the client's state;
+    # plain messages only carry the games that changed
+    event = "event: snapshot\n" if full else ""
+    return f"{event}id: {version}\ndata: {orjson.dumps(data).decode('utf-8')}\n\n"
+
+
+def scoreboard_event_stream():
+    """
+    Yields Server-Sent Events for one client: the full scoreboard first,
+    then only the games whose score or status changed. A client that fell
+    more than one version behind, or any client when games were added or
+    removed, gets the full scoreboard again as a "snapshot" event.
+    """
+    yield f"retry: {CLIENT_RETRY_MS}\n\n"
+
+    with _condition:
+        version = _state["version"]
+        snapshot = _state["snapshot"]
+    yield _event(version, snapshot, True)
+
+    while True:
+        with _condition:
+            _condition.wait_for(lambda: _state["version"] != version, timeout=KEEPALIVE_INTERVAL)
+            current = _state["version"]
+            full = _state["full"] or current != version + 1
+            data = _state["snapshot"] if full else _state["changes"]
+
+        if current == version:
+            yield ": keepalive\n\n"
+            continue
+
+        version = current
+        yield _event(version, data, full)
@@ -1,17 +1,22 @@
-from flask import Flask, render_template, abort
+from flask import Flask, Response, render_template, abort, request
 from flask_compress import Compress
-from api.scoreboard_data import get_scoreboard_data
-from api.boxscore_data import get_single_game_boxscore
-from datetime import date, datetime
+from api.scoreboard_data import (get_scoreboard_data, run_scoreboard_poller, cache_scoreboard_response,
+                                 SCOREBOARD_CACHE_KEY, SCOREBOARD_RESPONSE_KEY)
+from api.boxscore_data import get_single_game_boxscore, get_boxscore_delta
+from api.scoreboard_stream import run_scoreboard_change_detector, scoreboard_event_stream
+from datetime import date
 import time
 import threading
-from api.games_streams import get_basketball_games,  get_euro_basketball_games
-from utils.get_team_abbreves import team_colors, nba_logo_code, abv
-from services.db_service import get_all_replays, get_supabase_client, increment_view_count
-from services.redis_service import get_cache, set_cache
-from utils.optimizations import jsonify_with_etag, OrJSONProvider
+from api.games_streams import get_basketball_games, get_euro_basketball_games, get_game_lists
+from utils.get_team_abbreves import team_colors, nba_logo_code
+from utils.replay_page_model import build_replay_page_model
+from services.db_service import (get_all_replays, get_replay_info, increment_view_count, get_pending_view_counts,
+                                run_view_count_flusher, cache_replays, REPLAYS_PAGE_CACHE_KEY)
+from services.redis_service import get_cache, get_many, get_cache_swr, resolve_swr, set_cache_swr, peek_swr, run_when_leader, get_job_schedules
+from utils.optimizations import jsonify_with_etag, jsonify_cached, OrJSONProvider
 from api.momentum import get_momentum_data
-from api.player_stats import get_player_season_stats, update_league_player_stats
+from api.live_data import get_live_games
+from api.player_stats import get_player_season_stats, update_league_player_stats, PLAYER_STATS_CACHE_KEY
 
 app = Flask(__name__)
 Compress(app)
@@ -20,63 +25,112 @@ app.json = OrJSONProvider(app)
 
 current_date = date.today().strftime("%Y-%m-%d")
 
-GAMES_LIST_CACHE_TIMEOUT = 3600
-
-def background_cache_worker():
+# Game lists are served stale-while-revalidate: after the soft TTL a request
+# triggers a background refresh, but keeps getting the old list until the hard TTL.
+GAMES_LIST_SOFT_TTL = 1800
+GAMES_LIST_HARD_TTL = 21600
+# The leader refreshes the lists often around each tip-off, when stream links
+# appear and change, and rarely otherwise. Lists it writes stay fresh until just
+# after its next refresh, so requests never have to refresh them.
+GAMES_REFRESH_TIPOFF = 120
+GAMES_REFRESH_IDLE = 10800
+# Retry soon when the upstream fetch failed or came back empty
+GAMES_REFRESH_RETRY = 300
+TIPOFF_WINDOW_BEFORE = 1800
+TIPOFF_WINDOW_AFTER = 900
+GAMES_LIST_FRESH_MARGIN = 60
+NBA_GAMES_KEY = "nba_games_list"
+EURO_GAMES_KEY = "euro_games_list"
+
+# Marks a cache value that the caller has not read yet
+_NOT_READ = object()
+
+def _next_refresh_interval(*games_lists):
+    """
+    Seconds until the next games-list refresh: GAMES_REFRESH_TIPOFF inside any game's
+    tip-off window, otherwise until the next window opens, at most GAMES_REFRESH_IDLE.
+    """
+    now = time.time()
+    interval = GAMES_REFRESH_IDLE
+
+    for games in games_lists:
+        for game in games or []:
+            start = game.get("start_timestamp")
+            if not start:
+                continue
+            if start - TIPOFF_WINDOW_BEFORE <= now <= start + TIPOFF_WINDOW_AFTER:
+                return GAMES_REFRESH_TIPOFF
+            if start - TIPOFF_WINDOW_BEFORE > now:
+                interval = min(interval, start - TIPOFF_WINDOW_BEFORE - now)
+
+    return int(max(GAMES_REFRESH_TIPOFF, interval))
+
+def refresh_background_caches():
     """
-    Runs in the background to keep game data fresh.
-    This prevents the UI from ever waiting on the slow external APIs.
+    Keeps game data fresh so the UI never waits on the slow external APIs.
+    Runs on the leader process only; the new values are broadcast to every worker.
+    Returns the seconds until the next refresh, picked from the games' tip-off times.
     """
-    update_league_player_stats()
-    while True:
-        try:
-            nba_games = get_basketball_games()
-            if nba_games:
-                set_cache("nba_games_list", nba_games, GAMES_LIST_CACHE_TIMEOUT)
+    if not get_cache(PLAYER_STATS_CACHE_KEY):
+        update_league_player_stats()
 
-            euro_games = get_euro_basketball_games()
-            if euro_games:
-                set_cache("euro_games_list", euro_games, GAMES_LIST_CACHE_TIMEOUT)
+    nba_games, euro_games = None, None
+    try:
+        # One snapshot of every feed per cycle feeds both lists; embeds are
+        # probed here so dead links are dropped before they reach stream.html
+        nba_games, euro_games = get_game_lists(probe=True)
+    except Exception as e:
+        print(f"[Background Worker] ❌ Error updating cache: {e}")
 
-        except Exception as e:
-            print(f"[Background Worker] ❌ Error updating cache: {e}")
+    if not nba_games and not euro_games:
+        return GAMES_REFRESH_RETRY
 
-        time.sleep(1800)
+    # A list that came back empty is scheduled off its cached copy
+    interval = _next_refresh_interval(nba_games or peek_swr(NBA_GAMES_KEY), euro_games or peek_swr(EURO_GAMES_KEY))
+    soft_ttl = min(interval + GAMES_LIST_FRESH_MARGIN, GAMES_LIST_HARD_TTL)
 
-cache_thread = threading.Thread(target=background_cache_worker, daemon=True)
-cache_thread.start()
+    if nba_games:
+        set_cache_swr(NBA_GAMES_KEY, nba_games, soft_ttl, GAMES_LIST_HARD_TTL, broadcast=True)
+        # The scoreboard response only covers listed games, so rebuild it too
+        cache_scoreboard_response(build_scoreboard_response())
+    if euro_games:
+        set_cache_swr(EURO_GAMES_KEY, euro_games, soft_ttl, GAMES_LIST_HARD_TTL, broadcast=True)
 
-def get_game_list_from_cache_or_api():
-    cached_games = get_cache("nba_games_list")
-    if cached_games:
-        return cached_games
+    return interval
 
-    raw_games_list = get_basketball_games()
-    set_cache("nba_games_list", raw_games_list, GAMES_LIST_CACHE_TIMEOUT)
+def background_cache_worker():
+    run_when_leader(refresh_background_caches, name="games_lists")
 
-    return raw_games_list
+view_flush_thread = threading.Thread(target=run_view_count_flusher, daemon=True)
+view_flush_thread.start()
 
-def get_euro_games_from_cache_or_api():
-    cached_games = get_cache("euro_games_list")
-    if cached_games:
-        return cached_games
+# For envelopes already read with get_many; single-key reads use get_cache_swr
+def get_game_list_from_cache_or_api(envelope):
+    return resolve_swr(NBA_GAMES_KEY, envelope, get_basketball_games,
+                       GAMES_LIST_SOFT_TTL, GAMES_LIST_HARD_TTL, default=[])
 
-    raw_games = get_euro_basketball_games()
-    set_cache("euro_games_list", raw_games, 3600) # Cache for 1 hour
-    return raw_games
+def get_euro_games_from_cache_or_api(envelope):
+    return resolve_swr(EURO_GAMES_KEY, envelope, get_euro_basketball_games,
+                       GAMES_LIST_SOFT_TTL, GAMES_LIST_HARD_TTL, default=[])
 
 @app.route('/')
 def index():
-    games_list = get_game_list_from_cache_or_api()
-
-    for game in games_list:
-        away_tricode = game.get("away_tricode", "ATL")
-        home_tricode = game.get("home_tricode", "ATL")
-        default_color = "#333333"
-        game["away_color"] = team_colors.get(away_tricode, default_color)
-        game["home_color"] = team_colors.get(home_tricode, default_color)
-        game["away_logo"] = nba_logo_code.get(away_tricode, "1610612737")
-        game["home_logo"] = nba_logo_code.get(home_tricode, "1610612737")
+    # Games list and scoreboard in a single Redis round trip
+    nba_envelope, full_scoreboard = get_many([NBA_GAMES_KEY, SCOREBOARD_CACHE_KEY])
+    games_list = get_game_list_from_cache_or_api(nba_envelope)
+
+    # Cached games are shared with other requests, so decorate copies
+    default_color = "#333333"
+    games_list = [
+        {
+            **game,
+            "away_color": team_colors.get(game.get("away_tricode", "ATL"), default_color),
+            "home_color": team_colors.get(game.get("home_tricode", "ATL"), default_color),
+            "away_logo": nba_logo_code.get(game.get("away_tricode", "ATL"), "1610612737"),
+            "home_logo": nba_logo_code.get(game.get("home_tricode", "ATL"), "1610612737"),
+        }
+        for game in games_list
+    ]
 
     earliest_timestamp = 0
     if games_list:
@@ -85,7 +139,7 @@ def index():
             earliest_timestamp = min(valid_timestamps)
 
     scoreboard_data_teams = [game["teams"] for game in games_list]
-    scoreboard_data = get_scoreboard_data(scoreboard_data_teams)
+    scoreboard_data = get_scoreboard_data(scoreboard_data_teams, full_scoreboard or {})
 
     return render_template('index.html',
                            games=games_list,
@@ -95,14 +149,18 @@ def index():
 
 @app.route('/euro-league')
 def euro_leagues():
-    games_list = get_euro_games_from_cache_or_api()
+    games_list = get_cache_swr(EURO_GAMES_KEY, get_euro_basketball_games,
+                               GAMES_LIST_SOFT_TTL, GAMES_LIST_HARD_TTL, default=[])
     return render_template('euro_league_games.html', games=games_list)
 
 
 @app.route('/stream/<stream_id>')
 def stream_viewer(stream_id):
+    # Everything this page can need, in a single Redis round trip
+    nba_envelope, euro_envelope, full_scoreboard = get_many([NBA_GAMES_KEY, EURO_GAMES_KEY, SCOREBOARD_CACHE_KEY])
+
     # 1. Try Main NBA List
-    games_list = get_game_list_from_cache_or_api()
+    games_list = get_game_list_from_cache_or_api(nba_envelope)
     BASKETBALL_STREAMS = {stream['id']: stream for stream in games_list}
     stream_info = BASKETBALL_STREAMS.get(stream_id)
 
@@ -111,7 +169,7 @@ def stream_viewer(stream_id):
 
     # 2. If not found, try Other Leagues List
     if not stream_info:
-        other_games = get_euro_games_from_cache_or_api()
+        other_games = get_euro_games_from_cache_or_api(euro_envelope)
         OTHER_STREAMS = {stream['id']: stream for stream in other_games}
         stream_info = OTHER_STREAMS.get(stream_id)
 
@@ -119,14 +177,17 @@ def stream_viewer(stream_id):
         # --- NEW: Inject Team Colors for Chart ---
         away_code = stream_info.get('away_tricode')
         home_code = stream_info.get('home_tricode')
-        # Default to Zinc-400 if missing
-        stream_info['away_color'] = team_colors.get(away_code, '#a1a1aa')
-        stream_info['home_color'] = team_colors.get(home_code, '#a1a1aa')
+        # Default to Zinc-400 if missing; copy first, the cached entry is shared
+        stream_info = {
+            **stream_info,
+            'away_color': team_colors.get(away_code, '#a1a1aa'),
+            'home_color': team_colors.get(home_code, '#a1a1aa'),
+        }
         # ------------------------------------------
 
         # Only try to get NBA scoreboard data if it looks like an NBA game (has specific teams key)
         if stream_info.get("teams") != "OTHER":
-            scoreboard_data_raw = get_scoreboard_data([stream_info['teams']])
+            scoreboard_data_raw = get_scoreboard_data([stream_info['teams']], full_scoreboard or {})
             if scoreboard_data_raw and stream_info.get("teams") in scoreboard_data_raw:
                 game_data = scoreboard_data_raw.get(stream_info.get("teams"))
                 game_id_nba = game_data.get("game_id")
@@ -148,62 +209,22 @@ def stream_viewer(stream_id):
 
 @app.route('/replays')
 def replays_index():
-    cache_key = "replays_list_full"
-    raw_replays = get_cache(cache_key)
+    page_model = get_cache(REPLAYS_PAGE_CACHE_KEY)
 
-    if not raw_replays:
+    if not page_model:
         raw_replays = get_all_replays()
-        if raw_replays:
-             set_cache(cache_key, raw_replays, 43200) #12 hours
-    grouped_replays = {}
-    ordered_display_dates = []
-
-    for game in raw_replays:
-        away_team_name = game["away_team"]
-        home_team_name = game["home_team"]
-        try:
-            away_tricode = abv[away_team_name]
-            home_tricode = abv[home_team_name]
-            teams_tricode = away_tricode + home_tricode
-
-            default_color = "#333333"
-            game["away_color"] = team_colors.get(away_tricode, default_color)
-            game["home_color"] = team_colors.get(home_tricode, default_color)
-            game["away_logo"] = nba_logo_code[away_tricode]
-            game["home_logo"] = nba_logo_code[home_tricode]
-            game["teams"] = teams_tricode
-            game["title"] = f"{away_team_name} vs. {home_team_name}"
-        except KeyError:
-            continue
-
-        game_date_str = game["game_date"]
-        try:
-            dt_object = datetime.strptime(game_date_str, "%Y-%m-%d")
-            display_date = dt_object.strftime("%B %d, %Y")
-        except ValueError:
-            display_date = game_date_str
-
-        if display_date not in grouped_replays:
-            grouped_replays[display_date] = []
-        grouped_replays[display_date].append(game)
-
-    unique_raw_dates = sorted(list(set(g['game_date'] for g in raw_replays)), reverse=True)
-    for raw_date in unique_raw_dates:
-        try:
-            dt_object = datetime.strptime(raw_date, "%Y-%m-%d")
-            ordered_display_dates.append(dt_object.strftime("%B %d, %Y"))
-        except ValueError:
-            ordered_display_dates.append(raw_date)
-
-    return render_template('replays.html', grouped_replays=grouped_replays, ordered_dates=ordered_display_dates)
+        page_model = cache_replays(raw_replays) if raw_replays else build_replay_page_model([])
+
+    return render_template('replays.html',
+                           grouped_replays=page_model["grouped_replays"],
+                           ordered_dates=page_model["ordered_dates"],
+                           pending_views=get_pending_view_counts())
 
 @app.route('/replay/<stream_id>')
 def replay_stream_viewer(stream_id):
     increment_view_count(stream_id)
-    supabase = get_supabase_client()
     try:
-        response = supabase.table("nba_game_data_2025_26").select("iframe_url, away_team, home_team").eq("id", stream_id).limit(1).execute()
-        db_game_info = response.data[0] if response.data else None
+        db_game_info = get_replay_info(stream_id)
     except Exception as e:
         print(f"Error fetching replay {stream_id} from DB: {e}")
         abort(500, description="Database error fetching replay data.")
@@ -215,11 +236,14 @@ def replay_stream_viewer(stream_id):
     else:
         abort(404, description=f"Replay ID {stream_id} not found or iframe link is still pending scrape.")
 
-@app.route('/api/scoreboard')
-def api_scoreboard():
-    games_list = get_game_list_from_cache_or_api()
+def build_scoreboard_response(full_scoreboard=_NOT_READ):
+    if full_scoreboard is _NOT_READ:
+        nba_envelope, full_scoreboard = get_many([NBA_GAMES_KEY, SCOREBOARD_CACHE_KEY])
+    else:
+        nba_envelope = get_cache(NBA_GAMES_KEY)
+    games_list = get_game_list_from_cache_or_api(nba_envelope)
     scoreboard_data_teams = [game["teams"] for game in games_list]
-    scoreboard_data = get_scoreboard_data(scoreboard_data_teams)
+    scoreboard_data = get_scoreboard_data(scoreboard_data_teams, full_scoreboard or {})
 
     response_data = {}
     for game in games_list:
@@ -227,17 +251,55 @@ def api_scoreboard():
         if teams_key in scoreboard_data:
             response_data[teams_key] = scoreboard_data[teams_key]
 
-    return jsonify_with_etag(response_data, app)
+    return response_data
+
+# Both refresh build_scoreboard_response's output, so they start once it exists
+cache_thread = threading.Thread(target=background_cache_worker, daemon=True)
+cache_thread.start()
+
+# The poller writes the /api/scoreboard response next to every scoreboard it caches
+scoreboard_thread = threading.Thread(target=run_scoreboard_poller, args=(build_scoreboard_response,), daemon=True)
+scoreboard_thread.start()
+
+# One change detector per process feeds every open /api/scoreboard/stream
+scoreboard_events_thread = threading.Thread(target=run_scoreboard_change_detector,
+                                            args=(build_scoreboard_response,), daemon=True)
+scoreboard_events_thread.start()
+
+@app.route('/api/scoreboard')
+def api_scoreboard():
+    # Pre-built by the scoreboard poller; built on the spot only until its first poll
+    return jsonify_cached(SCOREBOARD_RESPONSE_KEY, app, build_scoreboard_response)
+
+@app.route('/api/scoreboard/stream')
+def api_scoreboard_stream():
+    # Pushes scoreboard changes as Server-Sent Events; /api/scoreboard stays as the polling fallback
+    return Response(scoreboard_event_stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/api/boxscore/<game_id>')
 def api_boxscore(game_id):
-    boxscore_data = get_single_game_boxscore(game_id)
-    return jsonify_with_etag(boxscore_data, app)
+    # ?since=<version> returns only the player rows that changed after that version
+    since = request.args.get('since', type=int)
+    if since is not None:
+        return jsonify_with_etag(get_boxscore_delta(game_id, since), app)
+    return jsonify_cached(f"boxscore:{game_id}", app,
+                          lambda: get_single_game_boxscore(game_id))
 
 @app.route('/api/momentum/<game_id>')
 def api_momentum(game_id):
-    data = get_momentum_data(game_id)
-    return jsonify_with_etag(data, app)
+    return jsonify_cached(f"momentum_3min:{game_id}", app,
+                          lambda: get_momentum_data(game_id))
+
+@app.route('/api/live')
+def api_live():
+    # Scoreboards for multiview's games (?ids=<stream ids>) in one response;
+    # box scores and momentum only when asked for (?fields=boxscore,momentum)
+    stream_ids = [stream_id for stream_id in request.args.get('ids', '').split(',') if stream_id]
+    fields = [field for field in request.args.get('fields', '').split(',') if field]
+    nba_envelope, full_scoreboard = get_many([NBA_GAMES_KEY, SCOREBOARD_CACHE_KEY])
+    games_list = get_game_list_from_cache_or_api(nba_envelope)
+    return jsonify_with_etag(get_live_games(stream_ids, games_list, full_scoreboard or {}, fields), app)
 
 @app.route('/multi-view')
 def multi_view():
@@ -245,14 +307,30 @@ def multi_view():
 
 @app.route('/api/games-today')
 def games_today():
-    games = get_game_list_from_cache_or_api()
+    games = get_cache_swr(NBA_GAMES_KEY, get_basketball_games,
+                          GAMES_LIST_SOFT_TTL, GAMES_LIST_HARD_TTL, default=[])
     return jsonify_with_etag(games, app)
 
 @app.route('/api/euro-games')
 def api_euro_games():
-    games = get_euro_games_from_cache_or_api()
+    games = get_cache_swr(EURO_GAMES_KEY, get_euro_basketball_games,
+                          GAMES_LIST_SOFT_TTL, GAMES_LIST_HARD_TTL, default=[])
     return jsonify_with_etag(games, app)
 
+@app.route('/api/multiview-games')
+def api_multiview_games():
+    """Both game lists for the multiview picker, read in one Redis round trip."""
+    nba_envelope, euro_envelope = get_many([NBA_GAMES_KEY, EURO_GAMES_KEY])
+    return jsonify_with_etag({
+        "nba": get_game_list_from_cache_or_api(nba_envelope),
+        "euro": get_euro_games_from_cache_or_api(euro_envelope),
+    }, app)
+
+@app.route('/api/jobs')
+def api_jobs():
+    # When each leader-only background job last ran and will run next
+    return jsonify_with_etag(get_job_schedules(), app)
+
 @app.route('/api/player-card/<int:player_id>')
 def api_player_card(player_id):
     stats = get_player_season_stats(player_id)
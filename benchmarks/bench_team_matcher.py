@@ -0,0 +1,75 @@
+"""
+Micro-benchmark for utils.get_team_abbreves.get_normalized_team_key.
+
+Compares the old linear scan (re-sort every team name, then one substring search
+per name) with the compiled matcher uncached (__wrapped__) and memoized, over a
+few thousand titles shaped like the stream feeds: NBA games in several formats
+and the other-league games the NBA parser has to reject.
+
+Run from the repo root:  python -m benchmarks.bench_team_matcher
+"""
+import random
+import timeit
+from utils import get_team_abbreves as teams
+
+TITLES = 3000
+ROUNDS = 20
+
+OTHER_TEAMS = ["Real Madrid", "FC Barcelona", "Olympiacos", "Fenerbahce", "Anadolu Efes", "Maccabi Tel Aviv",
+               "Partizan", "Zalgiris", "Duke Blue Devils", "Kentucky Wildcats", "Sydney Kings", "Perth Wildcats"]
+
+def _titles():
+    rng = random.Random(7)
+    names = list(teams.abv)
+    formats = ["{a} vs {b}", "{a} vs. {b}", "{a} @ {b}", "NBA: {a} vs {b}", "{a} - {b} (Live)"]
+    titles = []
+    for i in range(TITLES):
+        if i % 2:
+            a, b = rng.sample(names, 2)
+        else:
+            a, b = rng.sample(OTHER_TEAMS, 2)
+        titles.append(rng.choice(formats).format(a=a, b=b))
+    return titles
+
+def _legacy(title_str):
+    sorted_team_names = sorted(teams.abv.keys(), key=len, reverse=True)
+    found_teams = []
+    for team_name in sorted_team_names:
+        if team_name in title_str:
+            tricode = teams.abv[team_name]
+            if not any(t[0] == tricode for t in found_teams):
+                found_teams.append((tricode, team_name))
+            if len(found_teams) == 2:
+                break
+    if len(found_teams) == 2:
+        (t1, n1), (t2, n2) = found_teams
+        key = "".join(sorted([t1, t2]))
+        if title_str.find(n1) < title_str.find(n2):
+            return key, f"{n1} vs. {n2}", t1, t2
+        return key, f"{n2} vs. {n1}", t2, t1
+    return None, None, None, None
+
+def main():
+    titles = _titles()
+    for title in titles:
+        assert _legacy(title) == teams.get_normalized_team_key(title), title
+
+    candidates = (
+        ("legacy", _legacy),
+        ("compiled", teams.get_normalized_team_key.__wrapped__),
+        ("memoized", teams.get_normalized_team_key),
+    )
+    results = {}
+    for name, fn in candidates:
+        run = lambda: [fn(title) for title in titles]
+        run()  # warm up
+        seconds = min(timeit.repeat(run, number=ROUNDS, repeat=3))
+        results[name] = seconds / ROUNDS * 1e3
+
+    print(f"{TITLES} titles, ms per pass (best of 3 x {ROUNDS}):")
+    for name, millis in results.items():
+        speedup = results["legacy"] / millis
+        print(f"  {name:<9} {millis:8.2f}  ({speedup:.1f}x)")
+
+if __name__ == "__main__":
+    main()
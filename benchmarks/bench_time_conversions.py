@@ -0,0 +1,63 @@
+"""
+Micro-benchmarks for utils/time_conversions.
+
+Compares the uncached conversions (the memoized functions' __wrapped__ plus a
+pytz.timezone() lookup per call, which is what every call used to cost) with the
+memoized per-game calls and the batch APIs, over a synthetic 15-game slate.
+
+Run from the repo root:  python -m benchmarks.bench_time_conversions
+"""
+import timeit
+from datetime import datetime, timedelta, timezone
+import pytz
+from utils import time_conversions as tc
+
+GAMES = 15
+ROUNDS = 2000
+
+def _slate():
+    base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start_times = [(base + timedelta(minutes=30 * i)).strftime('%Y-%m-%dT%H:%M:%SZ') for i in range(GAMES)]
+    statuses = [f"{7 + i % 4}:{'30' if i % 2 else '00'} pm ET" for i in range(GAMES)]
+    et_times = [(base + timedelta(minutes=30 * i)).strftime('%Y-%m-%d %H:%M') for i in range(GAMES)]
+    return start_times, statuses, et_times
+
+def _uncached(start_times, statuses, et_times):
+    today = datetime.now(pytz.timezone('US/Central')).date()
+    current_date_et = datetime.now(pytz.timezone('US/Eastern')).date()
+    for start, status, et_time in zip(start_times, statuses, et_times):
+        pytz.timezone('US/Central')
+        tc._game_day_status.__wrapped__(start, today)
+        pytz.timezone('US/Eastern')
+        tc._et_time_to_cst.__wrapped__(status, current_date_et)
+        pytz.timezone('America/New_York')
+        tc._et_to_cst_status.__wrapped__(et_time, today)
+
+def _memoized(start_times, statuses, et_times):
+    for start, status, et_time in zip(start_times, statuses, et_times):
+        tc.has_game_started(start)
+        tc.get_game_day_status(start)
+        tc.convert_et_to_cst_conditional(status)
+        tc.format_et_to_cst_status(et_time)
+
+def _batch(start_times, statuses, et_times):
+    tc.has_game_started_batch(start_times)
+    tc.get_game_day_status_batch(start_times)
+    tc.convert_et_to_cst_conditional_batch(statuses)
+    tc.format_et_to_cst_status_batch(et_times)
+
+def main():
+    slate = _slate()
+    results = {}
+    for name, fn in (("uncached", _uncached), ("memoized", _memoized), ("batch", _batch)):
+        fn(*slate)  # warm up
+        seconds = min(timeit.repeat(lambda: fn(*slate), number=ROUNDS, repeat=3))
+        results[name] = seconds / ROUNDS * 1e6
+
+    print(f"{GAMES}-game slate, µs per slate (best of 3 x {ROUNDS}):")
+    for name, micros in results.items():
+        speedup = results["uncached"] / micros
+        print(f"  {name:<9} {micros:9.1f}  ({speedup:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+-- Lets the replay view flusher (services/db_service.flush_view_counts) add a
+-- whole batch of views in one call. Replaces the one-argument increment_views;
+-- the default keeps increment_views(row_id) calls working.
+drop function if exists increment_views(bigint);
+drop function if exists increment_views(integer);
+
+create or replace function increment_views(row_id bigint, amount integer default 1)
+returns void
+language sql
+as $$
+  update nba_game_data_2025_26
+  set views = coalesce(views, 0) + amount
+  where id = row_id;
+$$;
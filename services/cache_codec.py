@@ -0,0 +1,95 @@
+import os
+import json
+import zlib
+import orjson
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Every encoded value starts with: magic (2 bytes) + format version + codec id + compression id.
+# Values without the magic are plain JSON written before this header existed.
+MAGIC = b"NW"
+FORMAT_VERSION = b"1"
+HEADER_LENGTH = len(MAGIC) + 3
+
+COMPRESSION_THRESHOLD = int(os.environ.get("CACHE_COMPRESSION_THRESHOLD", 4096))
+
+SERIALIZERS = {
+    b"o": (
+        lambda data: orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS),
+        orjson.loads,
+    ),
+}
+if msgpack:
+    SERIALIZERS[b"m"] = (
+        lambda data: msgpack.packb(data, use_bin_type=True),
+        lambda raw: msgpack.unpackb(raw, raw=False, strict_map_key=False),
+    )
+
+COMPRESSORS = {
+    b"0": (lambda raw: raw, lambda raw: raw),
+    b"d": (lambda raw: zlib.compress(raw, 1), zlib.decompress),
+}
+if zstandard:
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+    COMPRESSORS[b"z"] = (_zstd_compressor.compress, _zstd_decompressor.decompress)
+if lz4_frame:
+    COMPRESSORS[b"l"] = (lz4_frame.compress, lz4_frame.decompress)
+
+_CODEC_NAMES = {"orjson": b"o", "msgpack": b"m"}
+_COMPRESSION_NAMES = {"none": b"0", "zlib": b"d", "zstd": b"z", "lz4": b"l"}
+
+def _pick(names, registry, requested, fallbacks):
+    """Resolves a configured name to a registered id, falling back to what is installed."""
+    for name in [requested] + fallbacks:
+        codec_id = names.get(name)
+        if codec_id in registry:
+            return codec_id
+    raise ValueError(f"No usable cache codec among {[requested] + fallbacks}")
+
+CODEC = _pick(_CODEC_NAMES, SERIALIZERS, os.environ.get("CACHE_CODEC", "orjson"), ["orjson"])
+COMPRESSION = _pick(_COMPRESSION_NAMES, COMPRESSORS, os.environ.get("CACHE_COMPRESSION", "zstd"), ["lz4", "zlib"])
+
+
+def encode_value(data) -> bytes:
+    """Serializes data with the configured codec, compressing payloads above the threshold."""
+    dumps, _ = SERIALIZERS[CODEC]
+    raw = dumps(data)
+
+    compression = b"0"
+    if len(raw) >= COMPRESSION_THRESHOLD:
+        compression = COMPRESSION
+        compress, _ = COMPRESSORS[compression]
+        raw = compress(raw)
+
+    return MAGIC + FORMAT_VERSION + CODEC + compression + raw
+
+def decode_value(raw: bytes):
+    """
+    Decodes a cached value.
+    Returns (data, is_legacy) where is_legacy marks plain JSON that should be re-encoded.
+    """
+    if not raw.startswith(MAGIC):
+        return json.loads(raw), True
+
+    header = raw[:HEADER_LENGTH]
+    version, codec, compression = header[2:3], header[3:4], header[4:5]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache format version {version!r}")
+
+    _, decompress = COMPRESSORS[compression]
+    _, loads = SERIALIZERS[codec]
+    return loads(decompress(raw[HEADER_LENGTH:])), False
@@ -0,0 +1,42 @@
+from services.redis_service import get_cache, set_cache
+from services import upstream_client
+
+# How long we remember an upstream's validators and the result they produced
+VALIDATORS_CACHE_TIMEOUT = 21600
+
+def fetch_json_if_modified(url, process, headers=None, deadline=None):
+    """
+    GETs a JSON url, sending If-None-Match / If-Modified-Since from the last 200.
+    process(json) turns the payload into the result we keep; on a 304 the stored
+    result is returned without downloading or parsing anything.
+
+    deadline caps the whole upstream call in seconds (see upstream_client.fetch).
+    Returns (result, changed). Raises httpx.HTTPStatusError on other non-2xx responses.
+    """
+    validators_key = f"http_validators:{url}"
+    previous = get_cache(validators_key)
+
+    headers = dict(headers or {})
+    if previous:
+        if previous.get("etag"):
+            headers['If-None-Match'] = previous["etag"]
+        if previous.get("last_modified"):
+            headers['If-Modified-Since'] = previous["last_modified"]
+
+    response = upstream_client.get(url, headers=headers, deadline=deadline)
+    if response.status_code == 304 and previous:
+        return previous["data"], False
+
+    response.raise_for_status()
+    result = process(response.json())
+
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        set_cache(validators_key, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "data": result
+        }, VALIDATORS_CACHE_TIMEOUT)
+
+    return result, True
@@ -2,7 +2,8 @@ import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from api.played_games import scrape_nba_schedule
-from services.redis_service import get_cache, set_cache
+from utils.replay_page_model import build_replay_page_model
+from services.redis_service import get_cache, set_many, increment_counter, get_counters, pop_counters, add_counters, run_when_leader
 
 load_dotenv()
 
@@ -10,6 +11,15 @@ SUPABASE_URL: str = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY: str = os.environ.get("SUPABASE_KEY")
 TABLE_NAME = "nba_game_data_2025_26"
 
+REPLAYS_CACHE_KEY = "replays_list_full"
+REPLAYS_PAGE_CACHE_KEY = "replays_page_model"
+REPLAY_INDEX_CACHE_KEY = "replay_index"
+REPLAYS_CACHE_TIMEOUT = 43200 # 12 hours
+
+# Replay views are counted in a Redis hash and pushed to Supabase in batches
+PENDING_VIEWS_KEY = "replay_views_pending"
+VIEW_FLUSH_INTERVAL = 60
+
 _supabase_client = None
 def get_supabase_client() -> Client:
     global _supabase_client
@@ -97,31 +107,137 @@ def get_games_to_scrape(limit: int = 1300) -> list:
 
 def increment_view_count(game_id):
     """
-    Increments the view count in Supabase AND updates the Redis cache
-    so the UI reflects the change immediately.
+    Counts a replay view with a single HINCRBY.
+    flush_view_counts() later pushes the aggregated deltas to Supabase.
     """
     try:
-        supabase = get_supabase_client()
-        game_id_int = int(game_id)
-        supabase.rpc('increment_views', {'row_id': game_id_int}).execute()
+        increment_counter(PENDING_VIEWS_KEY, str(int(game_id)))
+    except ValueError:
+        print(f"❌ Ignoring view for invalid replay id {game_id}")
+
+def get_pending_view_counts() -> dict:
+    """Views not yet flushed to Supabase, as {replay_id_str: count}."""
+    return get_counters(PENDING_VIEWS_KEY)
+
+# Whether the database has increment_views(row_id, amount), added by
+# migrations/increment_views_amount.sql. Until it is applied, deltas go through
+# the original increment_views(row_id), once per view.
+_views_rpc_takes_amount = True
+
+def _is_missing_function(error) -> bool:
+    """True if PostgREST says the called function doesn't exist (PGRST202)."""
+    return getattr(error, 'code', None) == 'PGRST202' or 'Could not find the function' in str(error)
+
+def _push_view_delta(supabase, row_id: int, delta: int) -> int:
+    """Adds delta views to one replay; returns how many were recorded before any error."""
+    global _views_rpc_takes_amount
+    if _views_rpc_takes_amount:
+        try:
+            supabase.rpc('increment_views', {'row_id': row_id, 'amount': delta}).execute()
+            return delta
+        except Exception as e:
+            if not _is_missing_function(e):
+                # The call may still have been applied, so never replay it view by view
+                print(f"❌ Failed to flush {delta} views for {row_id}: {e}")
+                return 0
+            print("⚠️ increment_views(row_id, amount) is missing; apply migrations/increment_views_amount.sql. Using the one-view RPC.")
+            _views_rpc_takes_amount = False
+
+    recorded = 0
+    try:
+        for _ in range(delta):
+            supabase.rpc('increment_views', {'row_id': row_id}).execute()
+            recorded += 1
+    except Exception as e:
+        print(f"❌ Failed to flush {delta - recorded} views for {row_id}: {e}")
+    return recorded
 
-        cache_key = "replays_list_full"
-        cached_games = get_cache(cache_key)
+def flush_view_counts() -> int:
+    """
+    Pushes pending view deltas to the increment_views RPC and folds them into
+    the cached replay list. Deltas that fail to flush are queued again.
+    Uses increment_views(row_id, amount) (migrations/increment_views_amount.sql),
+    falling back to the one-argument increment_views(row_id) only if it is missing.
+    """
+    deltas = pop_counters(PENDING_VIEWS_KEY)
+    if not deltas:
+        return 0
+
+    try:
+        supabase = get_supabase_client()
+    except Exception as e:
+        print(f"❌ Aborting view flush due to DB connection failure: {e}")
+        add_counters(PENDING_VIEWS_KEY, deltas)
+        return 0
+
+    flushed = {}
+    failed = {}
+    for game_id, delta in deltas.items():
+        recorded = _push_view_delta(supabase, int(game_id), delta)
+        if recorded:
+            flushed[game_id] = recorded
+        if recorded < delta:
+            failed[game_id] = delta - recorded
+
+    add_counters(PENDING_VIEWS_KEY, failed)
+
+    cached_games = get_cache(REPLAYS_CACHE_KEY)
+    if cached_games and flushed:
+        # Cached values are shared with readers, so copy the rows we change
+        updated_games = [
+            {**game, 'views': (game.get('views') or 0) + flushed[str(game.get('id'))]}
+            if str(game.get('id')) in flushed else game
+            for game in cached_games
+        ]
+        cache_replays(updated_games)
+
+    return sum(flushed.values())
+
+def _flush_view_counts_step():
+    try:
+        flush_view_counts()
+    except Exception as e:
+        print(f"[View Flusher] ❌ Error flushing view counts: {e}")
+    return VIEW_FLUSH_INTERVAL
 
-        if cached_games:
-            game_found = False
-            for game in cached_games:
-                if str(game.get('id')) == str(game_id):
-                    current_views = game.get('views') or 0
-                    game['views'] = current_views + 1
-                    game_found = True
-                    break
+def run_view_count_flusher():
+    """Background loop that flushes replay view counts every VIEW_FLUSH_INTERVAL seconds, on the leader only."""
+    run_when_leader(_flush_view_counts_step, name="view_count_flusher", initial_delay=VIEW_FLUSH_INTERVAL)
 
-            if game_found:
-                set_cache(cache_key, cached_games, 43200)
+def cache_replays(raw_replays: list) -> dict:
+    """
+    Caches the raw replay list together with its pre-built page model and
+    id index. Call this whenever the replay rows change. Returns the page model.
+    """
+    page_model = build_replay_page_model(raw_replays)
+    replay_index = {
+        str(game['id']): {
+            'iframe_url': game['iframe_url'],
+            'away_team': game['away_team'],
+            'home_team': game['home_team'],
+        }
+        for game in raw_replays if game.get('iframe_url')
+    }
+    set_many({
+        REPLAYS_CACHE_KEY: raw_replays,
+        REPLAYS_PAGE_CACHE_KEY: page_model,
+        REPLAY_INDEX_CACHE_KEY: replay_index,
+    }, REPLAYS_CACHE_TIMEOUT)
+    return page_model
+
+def get_replay_info(replay_id):
+    """
+    Returns {iframe_url, away_team, home_team} for a replay, or None if unknown.
+    Served from the cached replay index (in-process after the first hit);
+    only ids that are not indexed yet hit Supabase. Raises on DB errors.
+    """
+    replay_index = get_cache(REPLAY_INDEX_CACHE_KEY)
+    if replay_index and str(replay_id) in replay_index:
+        return replay_index[str(replay_id)]
 
-    except Exception as e:
-        print(f"❌ Failed to increment view count for {game_id}: {e}")
+    supabase = get_supabase_client()
+    response = supabase.table(TABLE_NAME).select("iframe_url, away_team, home_team").eq("id", replay_id).limit(1).execute()
+    return response.data[0] if response.data else None
 
 def get_all_replays():
     try:
@@ -1,32 +1,632 @@
 import os
 import redis
-import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
+from services.cache_codec import encode_value, decode_value
 
 load_dotenv()
 
 redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 
+LOCAL_CACHE_MAX_ITEMS = int(os.environ.get("LOCAL_CACHE_MAX_ITEMS", 512))
+FALLBACK_CACHE_MAX_ITEMS = int(os.environ.get("FALLBACK_CACHE_MAX_ITEMS", 2048))
+INVALIDATION_CHANNEL = "cache_invalidate"
+# Carries new values themselves, so other workers refresh L1 without a Redis read
+UPDATE_CHANNEL = "cache_update"
+
+# Fail fast instead of letting request threads pile up behind a slow Redis
+REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT", 0.5))
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_PROBE_INTERVAL = 5
+
+# Unique per process so a worker can ignore its own invalidation messages
+_INSTANCE_ID = uuid.uuid4().hex
+
 try:
-    redis_client = redis.from_url(redis_url, decode_responses=True)
+    redis_client = redis.from_url(
+        redis_url,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        health_check_interval=30
+    )
 except Exception as e:
     print(f"Warning: Could not connect to Redis. Caching will be disabled. Error: {e}")
     redis_client = None
 
+
+class _LocalLRU:
+    """
+    Small thread-safe LRU of already-deserialized values.
+    Each entry expires at the same moment its Redis key does.
+    """
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl_seconds):
+        if ttl_seconds <= 0:
+            self.delete(key)
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_local_cache = _LocalLRU(LOCAL_CACHE_MAX_ITEMS)
+# Holds everything written while Redis is unreachable
+_fallback_cache = _LocalLRU(FALLBACK_CACHE_MAX_ITEMS)
+
+
+class _CircuitBreaker:
+    """
+    Opens after consecutive Redis failures so callers skip Redis entirely and
+    use the in-memory fallback. A background thread pings Redis until it answers.
+    """
+
+    def __init__(self, failure_threshold, probe_interval):
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.is_open = False
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        self._failures = 0
+
+    def record_failure(self, error):
+        with self._lock:
+            self._failures += 1
+            if self.is_open or self._failures < self.failure_threshold:
+                return
+            self.is_open = True
+
+        print(f"[Redis] ❌ Circuit opened after {self._failures} failures ({error}). Using in-memory fallback.")
+        threading.Thread(target=self._probe_until_recovered, daemon=True).start()
+
+    def _probe_until_recovered(self):
+        while True:
+            time.sleep(self.probe_interval)
+            try:
+                redis_client.ping()
+            except Exception:
+                continue
+
+            # Values written during the outage only exist in this process; drop them
+            # so reads go back to Redis as the single source of truth.
+            _fallback_cache.clear()
+            _local_cache.clear()
+            with self._lock:
+                self._failures = 0
+                self.is_open = False
+            print("[Redis] ✅ Circuit closed, Redis is reachable again.")
+            return
+
+
+_breaker = _CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_PROBE_INTERVAL)
+
+
+def _redis_available():
+    return redis_client is not None and not _breaker.is_open
+
+def _apply_update(payload):
+    """Stores a value another worker broadcast with set_many(..., broadcast=True) in L1."""
+    header, _, raw = payload.partition(b"\n")
+    origin, _, rest = header.decode().partition(":")
+    if origin == _INSTANCE_ID:
+        return
+    ttl, _, key = rest.partition(":")
+    value, _ = decode_value(raw)
+    _local_cache.set(key, value, float(ttl))
+
+def _listen_for_invalidations():
+    """
+    Drops L1 entries that another worker has overwritten in Redis,
+    and stores the values other workers broadcast.
+    """
+    reconnecting = False
+    while True:
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL, UPDATE_CHANNEL)
+            if reconnecting:
+                # Anything cached while we were disconnected may be stale
+                _local_cache.clear()
+                reconnecting = False
+
+            for message in pubsub.listen():
+                if message["channel"] == UPDATE_CHANNEL.encode():
+                    _apply_update(message["data"])
+                    continue
+
+                origin, _, key = message["data"].decode().partition(":")
+                if origin != _INSTANCE_ID:
+                    _local_cache.delete(key)
+        except Exception as e:
+            if not reconnecting:
+                print(f"Redis Invalidation Listener Error: {e}")
+            reconnecting = True
+            time.sleep(CIRCUIT_PROBE_INTERVAL)
+
+
+if redis_client:
+    threading.Thread(target=_listen_for_invalidations, daemon=True).start()
+
+
+def _remember(key, raw, ttl_ms):
+    """Decodes a raw Redis value, upgrades legacy encodings and fills the L1 cache."""
+    value, is_legacy = decode_value(raw)
+    if is_legacy:
+        # Upgrade keys written as plain JSON in place, keeping their expiry
+        redis_client.set(key, encode_value(value), keepttl=True)
+
+    if ttl_ms and ttl_ms > 0:
+        _local_cache.set(key, value, ttl_ms / 1000)
+    return value
+
 def get_cache(key):
-    """Retrieve data from Redis and deserialize JSON."""
-    if not redis_client: return None
+    """
+    Retrieve data from the in-process cache, falling back to Redis.
+    Values are shared between requests, so treat them as read-only.
+    """
+    cached = _local_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if not _redis_available(): return _fallback_cache.get(key)
     try:
-        data = redis_client.get(key)
-        return json.loads(data) if data else None
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.pttl(key)
+        data, ttl_ms = pipe.execute()
+        _breaker.record_success()
+        if not data:
+            return None
+
+        return _remember(key, data, ttl_ms)
     except Exception as e:
         print(f"Redis Get Error: {e}")
-        return None
+        _breaker.record_failure(e)
+        return _fallback_cache.get(key)
+
+def get_many(keys):
+    """
+    Retrieve several keys at once. Returns values in the same order as keys,
+    with None for misses. Everything not in L1 costs a single Redis round trip.
+    """
+    results = [_local_cache.get(key) for key in keys]
+    missing = [i for i, value in enumerate(results) if value is None]
+    if not missing: return results
+
+    if not _redis_available():
+        for i in missing:
+            results[i] = _fallback_cache.get(keys[i])
+        return results
+
+    try:
+        missing_keys = [keys[i] for i in missing]
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.mget(missing_keys)
+        for key in missing_keys:
+            pipe.pttl(key)
+        raw_values, *ttls = pipe.execute()
+        _breaker.record_success()
+
+        for i, raw, ttl_ms in zip(missing, raw_values, ttls):
+            if raw:
+                results[i] = _remember(keys[i], raw, ttl_ms)
+    except Exception as e:
+        print(f"Redis MGET Error: {e}")
+        _breaker.record_failure(e)
+        for i in missing:
+            results[i] = _fallback_cache.get(keys[i])
+
+    return results
+
+def set_cache(key, data, timeout=300, broadcast=False):
+    """
+    Encode data with the cache codec and save to Redis with expiration.
+    """
+    set_many({key: data}, timeout, broadcast)
+
+def set_many(mapping, timeout=300, broadcast=False):
+    """
+    Save several keys with the same expiration in one pipelined round trip.
+    With broadcast=True the values themselves are published, so every
+    worker's L1 holds them right away.
+    """
+    if _redis_available():
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, data in mapping.items():
+                raw = encode_value(data)
+                pipe.setex(key, timeout, raw)
+                if broadcast:
+                    pipe.publish(UPDATE_CHANNEL, f"{_INSTANCE_ID}:{timeout}:{key}\n".encode() + raw)
+                else:
+                    pipe.publish(INVALIDATION_CHANNEL, f"{_INSTANCE_ID}:{key}")
+            pipe.execute()
+            _breaker.record_success()
+
+            for key, data in mapping.items():
+                _local_cache.set(key, data, timeout)
+            return
+        except Exception as e:
+            print(f"Redis Set Error: {e}")
+            _breaker.record_failure(e)
+
+    # Reads check L1 before the fallback, so update both or readers keep the pre-outage value
+    for key, data in mapping.items():
+        _fallback_cache.set(key, data, timeout)
+        _local_cache.set(key, data, timeout)
+
 
-def set_cache(key, data, timeout=300):
-    """Serialize data to JSON and save to Redis with expiration."""
-    if not redis_client: return
+SINGLE_FLIGHT_LOCK_TTL_MS = 10000
+SINGLE_FLIGHT_WAIT_TIMEOUT = 10
+# Upstream calls made by single_flight loaders must finish within this (retries
+# included), so the lock never expires mid-fetch and waiters don't give up first
+SINGLE_FLIGHT_FETCH_DEADLINE = 7
+SINGLE_FLIGHT_POLL_INTERVAL = 0.1
+
+# Compare-and-delete so a worker never releases a lock it no longer owns
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+def acquire_lock(name, ttl_ms=SINGLE_FLIGHT_LOCK_TTL_MS, strict=False):
+    """
+    Tries to take a short-lived Redis lock.
+    Returns an ownership token, or None if another worker holds it.
+    If Redis can't be asked, the lock counts as taken unless strict=True,
+    for callers that must never run twice (e.g. leader election).
+    """
+    token = f"{_INSTANCE_ID}:{uuid.uuid4().hex}"
+    # Without Redis we can only coordinate inside this process
+    if not _redis_available(): return None if strict else token
     try:
-        redis_client.setex(key, timeout, json.dumps(data))
+        acquired = redis_client.set(f"lock:{name}", token, nx=True, px=ttl_ms)
+        _breaker.record_success()
+        return token if acquired else None
     except Exception as e:
-        print(f"Redis Set Error: {e}")
+        print(f"Redis Lock Error: {e}")
+        _breaker.record_failure(e)
+        return None if strict else token
+
+def release_lock(name, token):
+    if not _redis_available() or not token: return
+    try:
+        redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{name}", token)
+    except Exception as e:
+        print(f"Redis Unlock Error: {e}")
+        _breaker.record_failure(e)
+
+def _is_locked(name):
+    if not _redis_available(): return False
+    try:
+        return bool(redis_client.exists(f"lock:{name}"))
+    except Exception as e:
+        _breaker.record_failure(e)
+        return False
+
+def _load_across_workers(key, loader, lock_ttl_ms, wait_timeout):
+    token = acquire_lock(key, lock_ttl_ms)
+    if token:
+        try:
+            # Another worker may have filled the key while we raced for the lock
+            cached = get_cache(key)
+            if cached:
+                return cached
+            return loader()
+        finally:
+            release_lock(key, token)
+
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+        cached = get_cache(key)
+        if cached:
+            return cached
+        if not _is_locked(key):
+            # The other worker finished without caching anything (e.g. upstream error)
+            break
+
+    return loader()
+
+def single_flight(key, loader, lock_ttl_ms=SINGLE_FLIGHT_LOCK_TTL_MS, wait_timeout=SINGLE_FLIGHT_WAIT_TIMEOUT):
+    """
+    Runs loader() at most once per key, across threads and gunicorn workers.
+    loader is expected to write the cache for key itself. Threads in the same
+    process share its return value; other workers wait for the cached value.
+    Returns None if the in-process leader did not finish within wait_timeout.
+    """
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _Flight()
+            _inflight[key] = flight
+
+    if not is_leader:
+        if flight.done.wait(wait_timeout):
+            return flight.result
+        return get_cache(key)
+
+    try:
+        flight.result = _load_across_workers(key, loader, lock_ttl_ms, wait_timeout)
+        return flight.result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+
+
+SWR_REFRESH_LOCK_TTL_MS = 60000
+
+_refreshing = set()
+
+
+def set_cache_swr(key, data, soft_ttl, hard_ttl, broadcast=False):
+    """Stores data as fresh for soft_ttl seconds; the Redis key itself lives for hard_ttl."""
+    set_cache(key, {"value": data, "fresh_until": time.time() + soft_ttl}, hard_ttl, broadcast)
+
+def _unwrap_swr(envelope):
+    """Returns (value, is_fresh). Plain values written before SWR existed count as stale."""
+    if isinstance(envelope, dict) and "fresh_until" in envelope:
+        return envelope.get("value"), envelope["fresh_until"] > time.time()
+    return envelope, False
+
+def peek_swr(key):
+    """The value stored under an SWR key, fresh or not, without triggering a refresh."""
+    return _unwrap_swr(get_cache(key))[0]
+
+def _run_swr_refresh(key, refresh_fn, soft_ttl, hard_ttl):
+    token = acquire_lock(f"swr:{key}", SWR_REFRESH_LOCK_TTL_MS)
+    try:
+        if not token:
+            return  # Another worker is already refreshing this key
+
+        data = refresh_fn()
+        # Keep serving the last good value if the upstream came back empty
+        if data:
+            set_cache_swr(key, data, soft_ttl, hard_ttl)
+    except Exception as e:
+        print(f"[SWR] Error refreshing {key}: {e}")
+    finally:
+        release_lock(f"swr:{key}", token)
+        with _inflight_lock:
+            _refreshing.discard(key)
+
+def refresh_in_background(key, refresh_fn, soft_ttl, hard_ttl):
+    """Starts at most one background refresh per key in this process."""
+    with _inflight_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    threading.Thread(
+        target=_run_swr_refresh,
+        args=(key, refresh_fn, soft_ttl, hard_ttl),
+        daemon=True
+    ).start()
+
+def get_cache_swr(key, refresh_fn, soft_ttl, hard_ttl, default=None):
+    """
+    Stale-while-revalidate read. Always answers from the last good value and
+    never calls refresh_fn inline; stale or missing keys are refreshed in a
+    background thread. Returns default until a first value exists.
+    """
+    return resolve_swr(key, get_cache(key), refresh_fn, soft_ttl, hard_ttl, default)
+
+def resolve_swr(key, envelope, refresh_fn, soft_ttl, hard_ttl, default=None):
+    """Same as get_cache_swr, for an envelope already read (e.g. through get_many)."""
+    value, is_fresh = _unwrap_swr(envelope)
+
+    if not is_fresh:
+        refresh_in_background(key, refresh_fn, soft_ttl, hard_ttl)
+
+    return value if value is not None else default
+
+
+# Counter increments made while Redis is unreachable, keyed by hash then field
+_local_counters = {}
+_counters_lock = threading.Lock()
+
+
+def _add_local_counters(hash_key, counters):
+    with _counters_lock:
+        local = _local_counters.setdefault(hash_key, {})
+        for field, amount in counters.items():
+            local[field] = local.get(field, 0) + amount
+
+def increment_counter(hash_key, field, amount=1):
+    """HINCRBY a counter in a Redis hash, buffering locally while Redis is down."""
+    add_counters(hash_key, {field: amount})
+
+def get_counters(hash_key):
+    """Returns every counter in a hash as {field: int}, including locally buffered ones."""
+    counters = {}
+    if _redis_available():
+        try:
+            raw = redis_client.hgetall(hash_key)
+            _breaker.record_success()
+            counters = {field.decode(): int(value) for field, value in raw.items()}
+        except Exception as e:
+            print(f"Redis HGETALL Error: {e}")
+            _breaker.record_failure(e)
+
+    with _counters_lock:
+        for field, amount in _local_counters.get(hash_key, {}).items():
+            counters[field] = counters.get(field, 0) + amount
+    return counters
+
+def pop_counters(hash_key):
+    """Atomically reads and clears a counter hash. Put back unprocessed counters with add_counters."""
+    counters = {}
+    if _redis_available():
+        try:
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.hgetall(hash_key)
+            pipe.delete(hash_key)
+            raw, _ = pipe.execute()
+            _breaker.record_success()
+            counters = {field.decode(): int(value) for field, value in raw.items()}
+        except Exception as e:
+            print(f"Redis Counter Pop Error: {e}")
+            _breaker.record_failure(e)
+
+    with _counters_lock:
+        for field, amount in _local_counters.pop(hash_key, {}).items():
+            counters[field] = counters.get(field, 0) + amount
+    return counters
+
+def add_counters(hash_key, counters):
+    """Adds {field: amount} to a counter hash in one pipelined round trip."""
+    if not counters: return
+    if _redis_available():
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for field, amount in counters.items():
+                pipe.hincrby(hash_key, field, amount)
+            pipe.execute()
+            _breaker.record_success()
+            return
+        except Exception as e:
+            print(f"Redis HINCRBY Error: {e}")
+            _breaker.record_failure(e)
+
+    _add_local_counters(hash_key, counters)
+
+
+LEADER_LOCK_NAME = "background_leader"
+LEADER_LOCK_TTL_MS = 15000
+LEADER_RENEW_INTERVAL = 5
+
+# Extends a lock only while we still own it
+_RENEW_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_leader_token = None
+
+def _renew_lock(name, token, ttl_ms):
+    try:
+        renewed = redis_client.eval(_RENEW_LOCK_SCRIPT, 1, f"lock:{name}", token, ttl_ms)
+        _breaker.record_success()
+        return bool(renewed)
+    except Exception as e:
+        print(f"Redis Lock Renew Error: {e}")
+        _breaker.record_failure(e)
+        return False
+
+def _run_leader_election():
+    """
+    Keeps trying to hold the leader lock, renewing it while we have it.
+    If the leader dies its lock expires within LEADER_LOCK_TTL_MS and another process takes over.
+    """
+    global _leader_token
+    while True:
+        if _redis_available():
+            if _leader_token and not _renew_lock(LEADER_LOCK_NAME, _leader_token, LEADER_LOCK_TTL_MS):
+                print("[Leader] Lost background leadership.")
+                _leader_token = None
+            if not _leader_token:
+                # A Redis error must not crown a second leader
+                _leader_token = acquire_lock(LEADER_LOCK_NAME, LEADER_LOCK_TTL_MS, strict=True)
+                if _leader_token:
+                    print(f"[Leader] {_INSTANCE_ID} is now the background leader.")
+        time.sleep(LEADER_RENEW_INTERVAL)
+
+def is_leader():
+    """
+    True in the one process that should talk to upstream APIs in the background.
+    Without Redis there is nothing to coordinate with, so every process is its own leader.
+    """
+    return not _redis_available() or _leader_token is not None
+
+# Each leader job's last and next run, so the schedule can be inspected (/api/jobs)
+JOB_SCHEDULE_KEY_PREFIX = "job_schedule:"
+# Schedules outlive their next run by this much; a missing one means the job is overdue
+JOB_SCHEDULE_GRACE = 60
+
+BACKGROUND_JOBS = []
+
+def _record_job_schedule(name, interval):
+    now = time.time()
+    set_cache(f"{JOB_SCHEDULE_KEY_PREFIX}{name}", {
+        "last_run_at": now,
+        "next_run_at": now + interval,
+        "interval": interval,
+        "leader": _INSTANCE_ID,
+    }, int(interval) + JOB_SCHEDULE_GRACE)
+
+def get_job_schedules():
+    """{job: schedule} for every background job this process knows; None if it hasn't run lately."""
+    return dict(zip(BACKGROUND_JOBS, get_many([f"{JOB_SCHEDULE_KEY_PREFIX}{name}" for name in BACKGROUND_JOBS])))
+
+def run_when_leader(step, follower_interval=LEADER_RENEW_INTERVAL, name=None, initial_delay=0):
+    """
+    Background loop that calls step() only while this process is the leader,
+    starting after initial_delay seconds. step() returns how many seconds to
+    wait before its next run; followers check again every follower_interval seconds.
+    """
+    name = name or getattr(step, '__name__', str(step)).strip('_')
+    BACKGROUND_JOBS.append(name)
+    time.sleep(initial_delay)
+
+    while True:
+        interval = follower_interval
+        if is_leader():
+            try:
+                interval = step()
+                _record_job_schedule(name, interval)
+            except Exception as e:
+                print(f"[Leader] Background step {name} failed: {e}")
+        time.sleep(interval)
+
+if redis_client:
+    threading.Thread(target=_run_leader_election, daemon=True).start()
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from services import upstream_client
+from services.redis_service import get_cache, set_cache
+
+# {url: {"ok": bool, "ttfb_ms": int | None, "checked_at": epoch seconds}}, written by the leader
+STREAM_HEALTH_KEY = "stream_health"
+STREAM_HEALTH_TTL = 3600
+
+# A whole probe round never takes longer than PROBE_BUDGET seconds;
+# embeds that haven't answered by then keep their last known health
+PROBE_BUDGET = 8
+PROBE_TIMEOUT = 5
+PROBE_CONCURRENCY = 20
+# Embeds checked more recently than this are not probed again
+PROBE_RECHECK_AFTER = 300
+
+PROBE_HEADERS = {'Accept': 'text/html'}
+
+async def _probe(url, semaphore):
+    async with semaphore:
+        try:
+            status, ttfb = await upstream_client.probe(url, headers=PROBE_HEADERS, timeout=PROBE_TIMEOUT)
+            ok = status < 400
+        except Exception:
+            # Unreachable, timed out or not even a valid URL: all count as dead
+            ok, ttfb = False, None
+
+    return url, {
+        "ok": ok,
+        "ttfb_ms": int(ttfb * 1000) if ok else None,
+        "checked_at": time.time(),
+    }
+
+async def _probe_all(urls, budget):
+    """Probes urls concurrently; returns {url: health} for the ones done within the budget."""
+    semaphore = asyncio.Semaphore(PROBE_CONCURRENCY)
+    tasks = [asyncio.ensure_future(_probe(url, semaphore)) for url in urls]
+    if not tasks:
+        return {}
+
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+    if pending:
+        print(f"[Stream Health] {len(pending)} of {len(tasks)} embeds missed the {budget}s budget")
+
+    return dict(task.result() for task in done)
+
+def get_stream_health():
+    return get_cache(STREAM_HEALTH_KEY) or {}
+
+def probe_streams(urls):
+    """
+    Probes every embed not checked in the last PROBE_RECHECK_AFTER seconds,
+    records the results and returns the health of all known embeds.
+    Not a loop of its own: the leader calls this from its games-list refresh job.
+    """
+    now = time.time()
+    health = {
+        url: entry for url, entry in get_stream_health().items()
+        if now - entry["checked_at"] < STREAM_HEALTH_TTL
+    }
+
+    stale = [url for url in dict.fromkeys(urls)
+             if url not in health or now - health[url]["checked_at"] >= PROBE_RECHECK_AFTER]
+    if stale:
+        health.update(upstream_client.run(_probe_all(stale, PROBE_BUDGET)))
+        set_cache(STREAM_HEALTH_KEY, health, STREAM_HEALTH_TTL, broadcast=True)
+
+    return health
+
+def rank_streams(streams, health):
+    """
+    Healthy embeds fastest first, then never-probed ones in their original order.
+    Dead embeds are dropped, unless every embed is dead.
+    """
+    healthy = [url for url in streams if health.get(url, {}).get("ok")]
+    unknown = [url for url in streams if url not in health]
+    healthy.sort(key=lambda url: health[url]["ttfb_ms"])
+
+    return healthy + unknown or list(streams)
+
+def rank_games(games, health):
+    """Copies of the games with their streams ranked by rank_streams."""
+    return [{**game, "streams": rank_streams(game["streams"], health)} for game in games]
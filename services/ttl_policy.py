@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+
+# gameStatus values in the NBA live data feeds
+GAME_STATUS_SCHEDULED = 1
+GAME_STATUS_LIVE = 2
+GAME_STATUS_FINAL = 3
+
+# Pre-game data barely changes, but must not outlive tip-off by much
+PREGAME_TTL = 3600
+# Between periods (clock at 0:00) nothing moves for a couple of minutes
+PERIOD_BREAK_TTL = 60
+# Final data hardly changes, but keys must still expire (shared Redis, stat corrections)
+FINAL_TTL = 259200
+
+def game_state(game: dict) -> dict:
+    """Pulls the fields the policy needs out of a live-data 'game' object."""
+    return {
+        "status": game.get("gameStatus"),
+        "period": game.get("period", 0),
+        "clock": game.get("gameClock", ""),
+        "start_time_utc": game.get("gameTimeUTC"),
+    }
+
+def _seconds_until(start_time_utc: str) -> float:
+    try:
+        tip_off = datetime.fromisoformat(start_time_utc.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return PREGAME_TTL
+    return (tip_off - datetime.now(timezone.utc)).total_seconds()
+
+def cache_ttl(state: dict, live_ttl: int):
+    """
+    Cache lifetime in seconds for data about a game in the given state:
+    FINAL_TTL once it's final, live_ttl while it's being played,
+    and up to PREGAME_TTL before tip-off, never past the tip itself.
+    """
+    status = state.get("status")
+
+    if status == GAME_STATUS_FINAL:
+        return FINAL_TTL
+
+    if status == GAME_STATUS_SCHEDULED:
+        return int(max(live_ttl, min(PREGAME_TTL, _seconds_until(state.get("start_time_utc")))))
+
+    clock = state.get("clock") or ""
+    if status == GAME_STATUS_LIVE and state.get("period", 0) > 0 and clock.startswith("PT00M00"):
+        return max(live_ttl, PERIOD_BREAK_TTL)
+
+    return live_ttl
@@ -0,0 +1,109 @@
+import asyncio
+import random
+import threading
+import time
+import httpx
+
+# Every upstream API call goes through one pooled HTTP/2 client running on a
+# background event loop. Async code awaits fetch/fetch_json/gather_json;
+# sync code uses get/get_json/get_many_json, which block only the caller.
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json'
+}
+
+# Seconds per request, by host; anything else gets DEFAULT_TIMEOUT
+HOST_TIMEOUTS = {
+    "cdn.nba.com": 5,
+    "stats.nba.com": 30,
+    "lotusgamehd.xyz": 10,
+    "streamed.pk": 10,
+}
+DEFAULT_TIMEOUT = 10
+
+# Retries for connection errors and these statuses, with full-jitter backoff
+MAX_RETRIES = 2
+RETRY_BASE_DELAY = 0.25
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+POOL_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30)
+
+_loop = None
+_client = None
+_start_lock = threading.Lock()
+
+def _ensure_started():
+    """Starts the shared event loop thread and client on first use."""
+    global _loop, _client
+    with _start_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="upstream-client", daemon=True).start()
+            _client = httpx.AsyncClient(http2=True, limits=POOL_LIMITS, headers=HEADERS, follow_redirects=True)
+            _loop = loop
+    return _loop
+
+async def fetch(url, headers=None, params=None, timeout=None, deadline=None):
+    """
+    GETs a url, retrying connection errors and retryable statuses.
+    Returns the last response whatever its status; raises httpx.TransportError
+    if every attempt failed to connect. timeout applies to each phase of each
+    attempt; deadline, if given, caps all attempts together in seconds
+    (httpx.TimeoutException once it passes).
+    """
+    if deadline is None:
+        return await _fetch_with_retries(url, headers, params, timeout)
+    try:
+        return await asyncio.wait_for(_fetch_with_retries(url, headers, params, timeout), deadline)
+    except asyncio.TimeoutError:
+        raise httpx.TimeoutException(f"{url} took longer than {deadline}s")
+
+async def _fetch_with_retries(url, headers, params, timeout):
+    _ensure_started()
+    timeout = timeout or HOST_TIMEOUTS.get(httpx.URL(url).host, DEFAULT_TIMEOUT)
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = await _client.get(url, headers=headers, params=params, timeout=timeout)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return response
+        except httpx.TransportError:
+            if attempt == MAX_RETRIES:
+                raise
+        await asyncio.sleep(random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt))
+
+async def fetch_json(url, **kwargs):
+    """GETs a url and returns its JSON body; raises httpx.HTTPStatusError on non-2xx."""
+    response = await fetch(url, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+async def gather_json(urls):
+    """Fetches several urls concurrently. Failed ones come back as their exception."""
+    return await asyncio.gather(*(fetch_json(url) for url in urls), return_exceptions=True)
+
+async def probe(url, headers=None, timeout=None):
+    """
+    One GET without retries that stops once the response headers arrive.
+    Returns (status_code, seconds to first byte); raises httpx.TransportError
+    if the host could not be reached.
+    """
+    _ensure_started()
+    timeout = timeout or HOST_TIMEOUTS.get(httpx.URL(url).host, DEFAULT_TIMEOUT)
+    started = time.monotonic()
+    async with _client.stream("GET", url, headers=headers, timeout=timeout) as response:
+        return response.status_code, time.monotonic() - started
+
+def run(coro):
+    """Runs a coroutine on the shared client's event loop and waits for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _ensure_started()).result()
+
+def get(url, **kwargs):
+    return run(fetch(url, **kwargs))
+
+def get_json(url, **kwargs):
+    return run(fetch_json(url, **kwargs))
+
+def get_many_json(urls):
+    return run(gather_json(urls))
@@ -57,36 +57,38 @@ function launchMultiview() {
 }
 
 // --- Scoreboard & UI Logic ---
+function applyScoreboard(data) {
+  for (const teamsKey in data) {
+    if (data.hasOwnProperty(teamsKey)) {
+      const gameData = data[teamsKey];
+      const gameItem = document.querySelector(
+        `.game-item[data-teams="${teamsKey}"]`,
+      );
+
+      if (gameItem) {
+        const scoreText = gameItem.querySelector('.live-score-text');
+        const statusElement = gameItem.querySelector(
+          '.game-details[data-status]',
+        );
+
+        if (gameData.game_started_yet) {
+          if (scoreText) {
+            scoreText.textContent = `${gameData.away_score} - ${gameData.home_score}`;
+          }
+          statusElement.textContent = `| ${gameData.game_status}`;
+        }
+      }
+    }
+  }
+}
+
 function updateScoreboard() {
   fetch('/api/scoreboard')
     .then(response => {
       if (!response.ok) throw new Error('Network response was not ok');
       return response.json();
     })
-    .then(data => {
-      for (const teamsKey in data) {
-        if (data.hasOwnProperty(teamsKey)) {
-          const gameData = data[teamsKey];
-          const gameItem = document.querySelector(
-            `.game-item[data-teams="${teamsKey}"]`,
-          );
-
-          if (gameItem) {
-            const scoreText = gameItem.querySelector('.live-score-text');
-            const statusElement = gameItem.querySelector(
-              '.game-details[data-status]',
-            );
-
-            if (gameData.game_started_yet) {
-              if (scoreText) {
-                scoreText.textContent = `${gameData.away_score} - ${gameData.home_score}`;
-              }
-              statusElement.textContent = `| ${gameData.game_status}`;
-            }
-          }
-        }
-      }
-    })
+    .then(applyScoreboard)
     .catch(error => {
       console.error('Error fetching scoreboard data:', error);
     });
@@ -121,12 +123,8 @@ function runUpdateCycle() {
   updateScoreboard();
 }
 
-function startPollingManager() {
-  if (typeof EARLIEST_GAME_TS === 'undefined') return;
-
-  const MINUTES_BEFORE = 10;
-  const now = Math.floor(Date.now() / 1000);
-  const targetTime = EARLIEST_GAME_TS - MINUTES_BEFORE * 60;
+function startPolling() {
+  if (pollingIntervalId) return;
 
   const conditionalUpdate = () => {
     if (document.visibilityState === 'visible') {
@@ -140,15 +138,40 @@ function startPollingManager() {
     }
   });
 
+  runUpdateCycle();
+  pollingIntervalId = setInterval(conditionalUpdate, 20000);
+}
+
+// Server pushes only games whose score or status changed; falls back to polling
+function startLiveUpdates() {
+  if (!window.EventSource) {
+    startPolling();
+    return;
+  }
+
+  const source = new EventSource('/api/scoreboard/stream');
+  source.onmessage = event => applyScoreboard(JSON.parse(event.data));
+  source.addEventListener('snapshot', event => applyScoreboard(JSON.parse(event.data)));
+  source.onerror = () => {
+    // EventSource retries on its own; CLOSED means it gave up
+    if (source.readyState === EventSource.CLOSED) {
+      startPolling();
+    }
+  };
+}
+
+function startPollingManager() {
+  if (typeof EARLIEST_GAME_TS === 'undefined') return;
+
+  const MINUTES_BEFORE = 10;
+  const now = Math.floor(Date.now() / 1000);
+  const targetTime = EARLIEST_GAME_TS - MINUTES_BEFORE * 60;
+
   if (EARLIEST_GAME_TS === 0 || now >= targetTime) {
-    runUpdateCycle();
-    pollingIntervalId = setInterval(conditionalUpdate, 20000);
+    startLiveUpdates();
   } else {
     const secondsToWait = targetTime - now;
-    setTimeout(() => {
-      runUpdateCycle();
-      pollingIntervalId = setInterval(conditionalUpdate, 20000);
-    }, secondsToWait * 1000);
+    setTimeout(startLiveUpdates, secondsToWait * 1000);
   }
 }
 
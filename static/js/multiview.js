@@ -5,6 +5,7 @@ let nbaGamesCache = [];
 let euroGamesCache = [];
 let idleTimer = null;
 const IDLE_TIMEOUT = 3000;
+const LIVE_POLL_INTERVAL = 15000;
 
 function setActiveGame(gameId) {
   activeGameId = gameId;
@@ -153,6 +154,8 @@ function createGameContainer(game, index) {
             }')" title="Remove">✕</button>
         </div>
 
+        <div class="live-score-overlay"></div>
+
         <div class="stream-container">
             <iframe src="${game.stream_url}"
                     allowfullscreen
@@ -165,6 +168,34 @@ function createGameContainer(game, index) {
   return container;
 }
 
+// --- Live Scores (one request for every selected game) ---
+function renderLiveScore(game, live) {
+  const container = document.querySelector(`[data-game-id="${game.game_id}"]`);
+  if (!container) return;
+
+  const overlay = container.querySelector('.live-score-overlay');
+  const scoreboard = live && live.scoreboard;
+  if (!overlay || !scoreboard || !scoreboard.game_started_yet) return;
+
+  const away = game.game_data.away_tricode || '';
+  const home = game.game_data.home_tricode || '';
+  overlay.textContent = `${away} ${scoreboard.away_score} - ${scoreboard.home_score} ${home} | ${scoreboard.game_status}`;
+  overlay.classList.add('visible');
+}
+
+function updateLiveScores() {
+  if (selectedGames.length === 0) return;
+  if (document.visibilityState !== 'visible') return;
+
+  const ids = selectedGames.map(g => g.game_id).join(',');
+  fetch(`/api/live?ids=${encodeURIComponent(ids)}`)
+    .then(r => r.json())
+    .then(data => {
+      selectedGames.forEach(game => renderLiveScore(game, data[game.game_id]));
+    })
+    .catch(err => console.error('Live data error:', err));
+}
+
 function changeStreamSource(gameId, streamIndex) {
   const game = selectedGames.find(g => g.game_id === gameId);
   if (!game || !game.streams || streamIndex >= game.streams.length) return;
@@ -258,18 +289,17 @@ function replaceWithGame(oldGameId, newGameId) {
 
   renderGames();
   saveSelectedGames();
+  updateLiveScores();
 
   closeGameSelector();
 }
 
 function showGameSelector(replacingGameId = null) {
-  const p1 = fetch('/api/games-today').then(res => res.json());
-  const p2 = fetch('/api/euro-games').then(res => res.json());
-
-  Promise.all([p1, p2])
-    .then(([nbaGames, euroGames]) => {
-      nbaGamesCache = nbaGames || [];
-      euroGamesCache = euroGames || [];
+  fetch('/api/multiview-games')
+    .then(res => res.json())
+    .then(({ nba, euro }) => {
+      nbaGamesCache = nba || [];
+      euroGamesCache = euro || [];
       allGames = [...nbaGamesCache, ...euroGamesCache];
 
       createGameSelectorModal(replacingGameId);
@@ -414,6 +444,7 @@ function addGame(gameId) {
 
   renderGames();
   saveSelectedGames();
+  updateLiveScores();
 
   const button = document.querySelector(
     `[data-game-id="${gameId}"] .add-game-btn`,
@@ -524,4 +555,6 @@ document.addEventListener('click', e => {
 document.addEventListener('DOMContentLoaded', () => {
   loadSelectedGames();
   setupIdleDetection();
+  setInterval(updateLiveScores, LIVE_POLL_INTERVAL);
+  document.addEventListener('visibilitychange', updateLiveScores);
 });
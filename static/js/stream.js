@@ -295,6 +295,28 @@ function renderTooltipContent(container, name, jersey, id, stats) {
 }
 
 // --- HTML Generation (Updated) ---
+function generatePlayerRowHTML(p) {
+  let playerName = p.name;
+  let rowClass = p.is_oncourt ? 'oncourt' : '';
+  if (p.is_starter) playerName = `<strong>*${playerName}</strong>`;
+
+  return `
+      <tr class="${rowClass}" data-player-id="${p.id}" data-min="${p.min}">
+        <td class="player-name-cell"
+            data-id="${p.id}"
+            data-name="${p.name}"
+            data-jersey="${p.jersey}"
+            onmouseenter="showPlayerCard(this)"
+            onmouseleave="hidePlayerCard(this)">
+            ${playerName}
+        </td>
+        <td>${p.min}</td><td>${p.pts}</td><td>${p.reb}</td><td>${p.ast}</td>
+        <td>${p.fgm_fga}</td><td>${p.fg3m_fg3a}</td>
+        <td>${p.stl}</td><td>${p.blk}</td><td>${p.to}</td>
+      </tr>
+    `;
+}
+
 function generateBoxScoreHTML(teamTricode, teamData) {
   let html = `
     <div id="tab-content-${teamTricode}" class="tab-content">
@@ -313,31 +335,62 @@ function generateBoxScoreHTML(teamTricode, teamData) {
   );
 
   players.forEach(p => {
-    let playerName = p.name;
-    let rowClass = p.is_oncourt ? 'oncourt' : '';
-    if (p.is_starter) playerName = `<strong>*${playerName}</strong>`;
-
-    html += `
-      <tr class="${rowClass}">
-        <td class="player-name-cell"
-            data-id="${p.id}"
-            data-name="${p.name}"
-            data-jersey="${p.jersey}"
-            onmouseenter="showPlayerCard(this)"
-            onmouseleave="hidePlayerCard(this)">
-            ${playerName}
-        </td>
-        <td>${p.min}</td><td>${p.pts}</td><td>${p.reb}</td><td>${p.ast}</td>
-        <td>${p.fgm_fga}</td><td>${p.fg3m_fg3a}</td>
-        <td>${p.stl}</td><td>${p.blk}</td><td>${p.to}</td>
-      </tr>
-    `;
+    html += generatePlayerRowHTML(p);
   });
 
   html += `</tbody></table></div>`;
   return html;
 }
 
+// Version of the last box score we rendered; the server sends only rows changed after it
+let boxScoreVersion = 0;
+
+function renderFullBoxScore(teams) {
+  for (const team in teams) {
+    if (teams[team].players) {
+      const newHtml = generateBoxScoreHTML(team, teams[team]);
+      const tableMatch = newHtml.match(/<table.*?<\/table>/s);
+      if (tableMatch) {
+        const div = document.getElementById(`tab-content-${team}`);
+        if (div) div.innerHTML = tableMatch[0];
+      }
+    }
+  }
+}
+
+// Patches only the rows that changed; returns false if a table is missing
+function applyBoxScoreDelta(teams) {
+  for (const team in teams) {
+    const tbody = document.querySelector(`#tab-content-${team} tbody`);
+    if (!tbody) return false;
+
+    const { changed, removed } = teams[team];
+
+    removed.forEach(id => {
+      const row = tbody.querySelector(`tr[data-player-id="${id}"]`);
+      if (row) row.remove();
+    });
+
+    changed.forEach(p => {
+      const template = document.createElement('template');
+      template.innerHTML = generatePlayerRowHTML(p).trim();
+      const newRow = template.content.firstChild;
+      const row = tbody.querySelector(`tr[data-player-id="${p.id}"]`);
+      if (row) row.replaceWith(newRow);
+      else tbody.appendChild(newRow);
+    });
+
+    // Keep the minutes ordering; appendChild moves the existing nodes
+    Array.from(tbody.querySelectorAll('tr'))
+      .sort(
+        (a, b) =>
+          (parseFloat(b.dataset.min) || 0) - (parseFloat(a.dataset.min) || 0),
+      )
+      .forEach(row => tbody.appendChild(row));
+  }
+  return true;
+}
+
 function fetchAndUpdateBoxScore() {
   const liveStatusElement = document.getElementById('live-status');
   if (!GAME_ID || GAME_ID === 'None' || GAME_ID === 'null') {
@@ -345,7 +398,7 @@ function fetchAndUpdateBoxScore() {
     return;
   }
 
-  fetch(`/api/boxscore/${GAME_ID}`)
+  fetch(`/api/boxscore/${GAME_ID}?since=${boxScoreVersion}`)
     .then(r => {
       if (!r.ok) throw new Error('HTTP ' + r.status);
       return r.json();
@@ -353,22 +406,16 @@ function fetchAndUpdateBoxScore() {
     .then(data => {
       if (data.error) throw new Error(data.error);
 
-      const tabNav = document.querySelector('.tab-nav');
       liveStatusElement.textContent = 'Box Score';
 
-      if (tabNav.children.length === 0) {
-        // Tabs should be handled by initStaticTabs
-      }
-
-      for (const team in data) {
-        if (data[team].players) {
-          const newHtml = generateBoxScoreHTML(team, data[team]);
-          const tableMatch = newHtml.match(/<table.*?<\/table>/s);
-          if (tableMatch) {
-            const div = document.getElementById(`tab-content-${team}`);
-            if (div) div.innerHTML = tableMatch[0];
-          }
-        }
+      if (data.full) {
+        renderFullBoxScore(data.teams);
+        boxScoreVersion = data.version;
+      } else if (applyBoxScoreDelta(data.teams)) {
+        boxScoreVersion = data.version;
+      } else {
+        // Nothing to patch yet; ask for everything next time
+        boxScoreVersion = 0;
       }
     })
     .catch(err => {
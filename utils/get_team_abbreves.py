@@ -1,3 +1,6 @@
+import re
+from functools import lru_cache
+
 abv = {
     # Atlantic Division
     "Boston Celtics": "BOS",
@@ -142,6 +145,16 @@ def extract_teams_from_game_title(game_title):
 
 
 
+# Built once: every team name in one alternation, longest first so
+# "Los Angeles Clippers" is tried before any shorter name
+_TEAM_NAMES_BY_LENGTH = sorted(abv.keys(), key=len, reverse=True)
+_TEAM_NAME_RANK = {name: i for i, name in enumerate(_TEAM_NAMES_BY_LENGTH)}
+_TEAM_NAME_PATTERN = re.compile("|".join(re.escape(name) for name in _TEAM_NAMES_BY_LENGTH))
+
+# Feeds repeat the same titles every refresh
+TITLE_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
 def get_normalized_team_key(title_str: str):
     """
     Finds the two competing teams from a title string, regardless of format.
@@ -153,22 +166,23 @@ def get_normalized_team_key(title_str: str):
     4. The second team tricode found (e.g., "LAL"), used as "home"
     """
 
-    # Sort team names by length (longest first) to correctly match
-    # "LA Clippers" before "LA Lakers" or "LA"
-    sorted_team_names = sorted(abv.keys(), key=len, reverse=True)
+    # One scan of the title; remember where each team name first appears
+    first_seen = {}
+    for match in _TEAM_NAME_PATTERN.finditer(title_str):
+        first_seen.setdefault(match.group(), match.start())
 
     found_teams = [] # Will store ('BOS', 'Boston Celtics')
 
-    for team_name in sorted_team_names:
-        if team_name in title_str:
-            tricode = abv[team_name]
-            # Add the tricode and full name if not already found
-            if not any(t[0] == tricode for t in found_teams):
-                found_teams.append((tricode, team_name))
+    # Longest names win, as before, if a title mentions more than two teams
+    for team_name in sorted(first_seen, key=_TEAM_NAME_RANK.get):
+        tricode = abv[team_name]
+        # Add the tricode and full name if not already found
+        if not any(t[0] == tricode for t in found_teams):
+            found_teams.append((tricode, team_name))
 
-            # Stop once we have two teams
-            if len(found_teams) == 2:
-                break
+        # Stop once we have two teams
+        if len(found_teams) == 2:
+            break
 
     if len(found_teams) == 2:
         # We have a match
@@ -180,7 +194,7 @@ def get_normalized_team_key(title_str: str):
 
         # Create a standard title
         # We guess away/home based on which appeared first in the title
-        if title_str.find(team_1_name) < title_str.find(team_2_name):
+        if first_seen[team_1_name] < first_seen[team_2_name]:
             away_tricode, home_tricode = team_1_tricode, team_2_tricode
             standard_title = f"{team_1_name} vs. {team_2_name}"
         else:
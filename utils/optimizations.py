@@ -1,5 +1,30 @@
 import hashlib
+import orjson
 from flask import request, make_response
+from services.redis_service import get_cache, set_cache, set_many
+
+def response_cache_key(key):
+    return f"{key}:response"
+
+def build_json_response(data):
+    """Serializes data once and fingerprints it, ready to be cached and served as-is."""
+    body = orjson.dumps(data, option=orjson.OPT_NAIVE_UTC).decode()
+    return {"body": body, "etag": hashlib.md5(body.encode('utf-8')).hexdigest()}
+
+def set_cache_with_response(key, data, timeout=300):
+    """Caches data and its pre-serialized response together in one round trip."""
+    set_many({key: data, response_cache_key(key): build_json_response(data)}, timeout)
+
+def _send_prepared(prepared):
+    # Check if client already has this version
+    if request.headers.get('If-None-Match') == prepared["etag"]:
+        # Return 304 Not Modified (Empty body)
+        return make_response('', 304)
+
+    response = make_response(prepared["body"])
+    response.headers['ETag'] = prepared["etag"]
+    response.headers['Content-Type'] = 'application/json'
+    return response
 
 def jsonify_with_etag(data,  app):
     # 1. Dump data to JSON string using our fast provider
@@ -8,19 +33,28 @@ def jsonify_with_etag(data,  app):
     # 2. Create a fingerprint (MD5 hash) of the content
     fingerprint = hashlib.md5(json_str.encode('utf-8')).hexdigest()
 
-    # 3. Check if client already has this version
-    if request.headers.get('If-None-Match') == fingerprint:
-        # Return 304 Not Modified (Empty body)
-        return make_response('', 304)
+    # 3. Send a 304 if the client already has this version, otherwise the full body
+    return _send_prepared({"body": json_str, "etag": fingerprint})
 
-    # 4. If new, send full response with the fingerprint
-    response = make_response(json_str)
-    response.headers['ETag'] = fingerprint
-    response.headers['Content-Type'] = 'application/json'
-    return response
+def jsonify_cached(key, app, loader, timeout=None):
+    """
+    Serves the response pre-serialized under '{key}:response' with no JSON
+    encoding or hashing. On a miss, loader() provides the data; when timeout
+    is given the built response is cached so the next request hits.
+    """
+    prepared = get_cache(response_cache_key(key))
+    if prepared:
+        return _send_prepared(prepared)
+
+    data = loader()
+    if timeout is None:
+        return jsonify_with_etag(data, app)
+
+    prepared = build_json_response(data)
+    set_cache(response_cache_key(key), prepared, timeout)
+    return _send_prepared(prepared)
 
 
-import orjson
 from flask.json.provider import JSONProvider
 
 # --- OPTIMIZATION: Custom High-Speed JSON Provider ---
@@ -0,0 +1,46 @@
+from datetime import datetime
+from utils.get_team_abbreves import team_colors, nba_logo_code, abv
+
+def _display_date(raw_date: str) -> str:
+    """'2025-10-21' -> 'October 21, 2025' (unparseable dates are shown as-is)."""
+    try:
+        return datetime.strptime(raw_date, "%Y-%m-%d").strftime("%B %d, %Y")
+    except ValueError:
+        return raw_date
+
+def build_replay_page_model(raw_replays: list) -> dict:
+    """
+    Turns the raw replay rows into the ready-to-render replays page:
+    games decorated with tricodes, colors and logos, grouped by display date,
+    plus the display dates sorted newest first.
+    Games with team names we don't recognise are skipped.
+    """
+    grouped_replays = {}
+    default_color = "#333333"
+
+    for game in raw_replays:
+        away_team_name = game["away_team"]
+        home_team_name = game["home_team"]
+        try:
+            away_tricode = abv[away_team_name]
+            home_tricode = abv[home_team_name]
+
+            decorated_game = {
+                **game,
+                "away_color": team_colors.get(away_tricode, default_color),
+                "home_color": team_colors.get(home_tricode, default_color),
+                "away_logo": nba_logo_code[away_tricode],
+                "home_logo": nba_logo_code[home_tricode],
+                "teams": away_tricode + home_tricode,
+                "title": f"{away_team_name} vs. {home_team_name}",
+            }
+        except KeyError:
+            continue
+
+        display_date = _display_date(game["game_date"])
+        grouped_replays.setdefault(display_date, []).append(decorated_game)
+
+    unique_raw_dates = sorted(set(g['game_date'] for g in raw_replays), reverse=True)
+    ordered_dates = [_display_date(raw_date) for raw_date in unique_raw_dates]
+
+    return {"grouped_replays": grouped_replays, "ordered_dates": ordered_dates}
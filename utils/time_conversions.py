@@ -1,8 +1,29 @@
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 import pytz
 import re
 import time
 
+# Zones are loaded once; pytz.timezone() is a dict lookup plus object setup on every call
+ET_ZONE = pytz.timezone('US/Eastern')
+CST_ZONE = pytz.timezone('US/Central')
+
+# Conversions that depend on "today" are memoized per (input, day), so a new
+# day naturally misses the cache and the old entries age out of the LRU.
+TIME_CACHE_SIZE = 2048
+
+# 'H:MM AM/PM ET' (case-insensitive), as sent in gameStatusText before tip-off
+ET_TIME_PATTERN = re.compile(r'^\d{1,2}:\d{2}\s(am|pm)\sET$', re.IGNORECASE)
+ISO_MINUTES_PATTERN = re.compile(r'PT(\d+)M(\d+)\.')
+ISO_MINUTES_ONLY_PATTERN = re.compile(r'PT(\d+)M')
+
+def _today_cst():
+    return datetime.now(CST_ZONE).date()
+
+@lru_cache(maxsize=TIME_CACHE_SIZE)
+def _parse_iso_utc(time_str: str) -> datetime:
+    return datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+
 def convert_time_and_check_day_12hr(est_time_str: str) -> str:
     """
     Converts a time string from EST/EDT to CST/CDT, outputs in 12-hour format (hh:mm PM),
@@ -50,12 +71,13 @@ def convert_time_and_check_day_12hr(est_time_str: str) -> str:
 
 
 
-def has_game_started(game_start_time_str):
+def has_game_started(game_start_time_str, current_time_utc=None):
     try:
-        target_time = datetime.fromisoformat(game_start_time_str.replace('Z', '+00:00'))
+        target_time = _parse_iso_utc(game_start_time_str)
 
         # 2. Get Current Time (Always use UTC for comparison)
-        current_time_utc = datetime.now(timezone.utc)
+        if current_time_utc is None:
+            current_time_utc = datetime.now(timezone.utc)
 
         # 3. Compare Times
         # If the target time is GREATER than the current time, the game has NOT started.
@@ -70,17 +92,14 @@ def has_game_started(game_start_time_str):
 
 
 def get_game_day_status(game_start_time_str: str) -> str:
+    return _game_day_status(game_start_time_str, _today_cst())
 
-    CST_ZONE = pytz.timezone('US/Central')
-
+@lru_cache(maxsize=TIME_CACHE_SIZE)
+def _game_day_status(game_start_time_str: str, current_date_cst) -> str:
     try:
         # 1. Localize Target Time (API time is UTC)
         # Convert API string to a UTC-aware datetime object
-        target_time_utc = datetime.fromisoformat(game_start_time_str.replace('Z', '+00:00'))
-
-        # 2. Get Current Date in CST
-        current_time_cst = datetime.now(CST_ZONE)
-        current_date_cst = current_time_cst.date()
+        target_time_utc = _parse_iso_utc(game_start_time_str)
 
         # 3. Convert Target Time to CST
         target_time_cst = target_time_utc.astimezone(CST_ZONE)
@@ -118,29 +137,20 @@ def convert_et_to_cst_conditional(input_string: str) -> str:
     only if it matches the format 'H:MM AM/PM ET'. Returns the original string
     if the format does not match.
     """
-
-    # Regular Expression to match 'H:MM AM/PM ET'
-    # Use re.IGNORECASE flag to allow 'am', 'pm', 'AM', or 'PM'.
-    # Note: We must also check the case of 'ET' if we want maximum flexibility,
-    # but the API usually uses 'ET' or 'EST', so we stick with 'ET' here.
-    TIME_PATTERN = r'^\d{1,2}:\d{2}\s(am|pm)\sET$'
-
     # Check if the input string matches the required time format
-    # Use re.IGNORECASE to fix the case mismatch
-    if not re.match(TIME_PATTERN, input_string, re.IGNORECASE):
+    if not ET_TIME_PATTERN.match(input_string):
         # If it does not match (e.g., 'Final', 'Scheduled', etc.), return the original string
         return input_string
 
-    # --- Conversion Logic ---
-
-    # Define Time Zones
-    ET_ZONE = pytz.timezone('US/Eastern')
-    CST_ZONE = pytz.timezone('US/Central')
+    # Establish Date Context (Necessary for accurate DST handling)
+    current_date_et = datetime.now(ET_ZONE).date()
+    return _et_time_to_cst(input_string, current_date_et)
 
-    # 1. Establish Date Context (Necessary for accurate DST handling)
-    current_date_et = datetime.now(CST_ZONE).astimezone(ET_ZONE).date()
+@lru_cache(maxsize=TIME_CACHE_SIZE)
+def _et_time_to_cst(input_string: str, current_date_et) -> str:
+    # --- Conversion Logic ---
 
-    # 2. Prepare and Parse the Input Time
+    # 1. Prepare and Parse the Input Time
     try:
         # Step A: Standardize the string for parsing (Crucial for %p to work!)
         # Python's datetime parser (%p) usually expects AM/PM to be uppercase.
@@ -154,14 +164,14 @@ def convert_et_to_cst_conditional(input_string: str) -> str:
         # If parsing fails despite the regex match, return the original string as a fallback
         return input_string
 
-    # 3. Localize to ET
+    # 2. Localize to ET
     target_time_naive = datetime.combine(current_date_et, time_part_naive.time())
     target_time_et = ET_ZONE.localize(target_time_naive)
 
-    # 4. Convert to Central Time (CST/CDT)
+    # 3. Convert to Central Time (CST/CDT)
     target_time_cst = target_time_et.astimezone(CST_ZONE)
 
-    # 5. Format and Return the CST Time
+    # 4. Format and Return the CST Time
     # Output format: H:MM PM CST (remove leading zero from hour, append Time Zone Abbreviation)
     # .lstrip('0') handles removing leading zero for hours 1-9
     formatted_cst_time = target_time_cst.strftime("%I:%M %p").lstrip('0')
@@ -169,13 +179,14 @@ def convert_et_to_cst_conditional(input_string: str) -> str:
     return f"{formatted_cst_time} {target_time_cst.strftime('%Z')}"
 
 
+@lru_cache(maxsize=TIME_CACHE_SIZE)
 def convert_iso_minutes(iso_time_str):
     """Converts ISO 8601 duration string (e.g., 'PT25M01.00S') to M:SS format."""
     if not isinstance(iso_time_str, str) or not iso_time_str.startswith('PT'):
         return ""
 
     # Pattern to match Minutes and Seconds
-    match = re.match(r'PT(\d+)M(\d+)\.', iso_time_str)
+    match = ISO_MINUTES_PATTERN.match(iso_time_str)
 
     if match:
         minutes = int(match.group(1))
@@ -184,31 +195,29 @@ def convert_iso_minutes(iso_time_str):
         return f"{minutes}:{seconds:02}"
 
     # Fallback for minutes only (e.g., 'PT1M')
-    match_m_only = re.match(r'PT(\d+)M', iso_time_str)
+    match_m_only = ISO_MINUTES_ONLY_PATTERN.match(iso_time_str)
     if match_m_only:
         return f"{int(match_m_only.group(1))}:00"
 
     return ""
 
 def format_et_to_cst_status(et_datetime_str: str) -> str:
+    return _et_to_cst_status(et_datetime_str, _today_cst())
 
-    et_tz = pytz.timezone('America/New_York')
-    cst_tz = pytz.timezone('America/Chicago')
+@lru_cache(maxsize=TIME_CACHE_SIZE)
+def _et_to_cst_status(et_datetime_str: str, today_date) -> str:
     input_format_24hr = '%Y-%m-%d %H:%M'
     output_format_12hr = '%l:%M %p' # e.g., 09:00 PM
 
     try:
         # 1. Parse and localize the input time as ET
         dt_et_naive = datetime.strptime(et_datetime_str, input_format_24hr)
-        dt_et = et_tz.localize(dt_et_naive)
+        dt_et = ET_ZONE.localize(dt_et_naive)
 
         # 2. Convert to CST
-        dt_cst = dt_et.astimezone(cst_tz)
+        dt_cst = dt_et.astimezone(CST_ZONE)
 
-        # 3. Get the current date in CST for comparison
-        # (Current time is Tuesday, November 4, 2025 at 12:48:19 PM CST)
-        now_cst = datetime.now(cst_tz)
-        today_date = now_cst.date()
+        # 3. Compare with the current date in CST
         target_date = dt_cst.date()
 
         # 4. Determine status and format time
@@ -227,10 +236,9 @@ def format_et_to_cst_status(et_datetime_str: str) -> str:
 
     except ValueError:
         return "Error: Invalid datetime format. Please use 'YYYY-MM-DD HH:MM'."
-    except pytz.exceptions.UnknownTimeZoneError:
-        return "Error: Time zone configuration issue."
 
 
+@lru_cache(maxsize=TIME_CACHE_SIZE)
 def convert_ms_to_yyyymmdd(ms_timestamp, timezone_str='US/Central'):
     """
     Converts a 13-digit millisecond Unix timestamp to a YYYY-MM-DD string
@@ -243,7 +251,7 @@ def convert_ms_to_yyyymmdd(ms_timestamp, timezone_str='US/Central'):
         dt_naive_utc = datetime.utcfromtimestamp(s_timestamp)
         dt_aware_utc = pytz.utc.localize(dt_naive_utc)
 
-        target_timezone = pytz.timezone(timezone_str)
+        target_timezone = CST_ZONE if timezone_str == 'US/Central' else pytz.timezone(timezone_str)
         dt_target = dt_aware_utc.astimezone(target_timezone)
 
         # Return in YYYY-MM-DD format
@@ -298,3 +306,25 @@ def has_date_passed(timestamp_ms):
 
     # Check if the input time is less than the current time
     return timestamp_ms < current_time_ms
+
+
+# --- Batch APIs: "now" is read once for a whole games list ---
+
+def has_game_started_batch(game_start_time_strs):
+    current_time_utc = datetime.now(timezone.utc)
+    return [has_game_started(time_str, current_time_utc) for time_str in game_start_time_strs]
+
+def get_game_day_status_batch(game_start_time_strs):
+    today = _today_cst()
+    return [_game_day_status(time_str, today) for time_str in game_start_time_strs]
+
+def convert_et_to_cst_conditional_batch(input_strings):
+    current_date_et = datetime.now(ET_ZONE).date()
+    return [
+        _et_time_to_cst(input_string, current_date_et) if ET_TIME_PATTERN.match(input_string) else input_string
+        for input_string in input_strings
+    ]
+
+def format_et_to_cst_status_batch(et_datetime_strs):
+    today = _today_cst()
+    return [_et_to_cst_status(et_datetime_str, today) for et_datetime_str in et_datetime_strs]